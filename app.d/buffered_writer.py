@@ -0,0 +1,146 @@
+"""
+buffered_writer.py
+
+Defines a buffered table writer for the RSS readers. Rows are collected as entries are read, and when the writer is
+flushed at the end of a poll, the buffered rows are built into one columnar table with newTable() and added to the
+writer's table at once. The writer's table is the merge of a LocalTableMap of the tables of every flush, so each flush
+shows up in the table in a single update, without a cross-language call per row. One writer can be shared by several
+readers and threads.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from deephaven import Types as dht
+from deephaven.TableTools import newTable, col, dateTimeCol, doubleCol, intCol, longCol, stringCol
+
+import jpy
+import threading
+
+#A map of tables whose merge() adds and removes the rows of tables as they're put in and removed from the map
+LocalTableMap = jpy.get_type("io.deephaven.db.v2.LocalTableMap")
+QueryConstants = jpy.get_type("io.deephaven.util.QueryConstants")
+
+#The column builder for each column type, and the null value of the primitive ones
+_COLUMN_BUILDERS = [
+    (dht.string, stringCol, None),
+    (dht.datetime, dateTimeCol, None),
+    (dht.double, doubleCol, QueryConstants.NULL_DOUBLE),
+    (dht.int64, longCol, QueryConstants.NULL_LONG),
+    (dht.int32, intCol, QueryConstants.NULL_INT)
+]
+
+def _column_builder(column_type):
+    """
+    Finds the newTable() column builder for a column type, and the value None is written as.
+
+    Returns:
+        (method, object): The column builder, and the null value.
+    """
+    for (builder_type, builder, null_value) in _COLUMN_BUILDERS:
+        if column_type == builder_type:
+            return (builder, null_value)
+    return (col, None)
+
+class BufferedTableWriter:
+    """
+    A table writer that buffers rows until it's flushed, and adds every flush to its table as one columnar table
+    """
+    def __init__(self, column_names, column_types):
+        """
+        Parameters:
+            column_names (list<str>): A list of column names for the table.
+            column_types (list<dht.type>): A list of column types for the table.
+        """
+        self.column_names = list(column_names)
+        self.column_types = list(column_types)
+        self._column_builders = [_column_builder(column_type) for column_type in self.column_types]
+
+        #The tables of every flush, by the number of flushes before it. An empty table is kept in the map so it always
+        #has a table to merge, even before the first flush.
+        self._table_map = LocalTableMap(None)
+        self._table_map.put("empty", self._new_flush_table([]))
+        self._table = self._table_map.merge()
+        self._rows = []
+        self._lock = threading.Lock()
+        self._stats = {
+            "rows": 0,
+            "flushes": 0,
+            "skipped_rows": 0
+        }
+
+    def append_rows(self, rows):
+        """
+        Buffers rows until the next flush. Rows that don't have exactly one value per column are skipped.
+        """
+        column_count = len(self.column_names)
+        valid_rows = []
+        skipped_rows = 0
+        for row in rows:
+            row = tuple(row)
+            if len(row) == column_count:
+                valid_rows.append(row)
+            else:
+                skipped_rows += 1
+                print(f"Skipping a row with {len(row)} values for a table with {column_count} columns")
+
+        with self._lock:
+            self._rows.extend(valid_rows)
+            self._stats["skipped_rows"] += skipped_rows
+
+    def _new_flush_table(self, rows):
+        """
+        Builds a columnar table of rows.
+        """
+        columns = []
+        column_values = zip(*rows) if rows else [()] * len(self.column_names)
+        for (name, (builder, null_value), values) in zip(self.column_names, self._column_builders, column_values):
+            if null_value is not None:
+                values = [null_value if value is None else value for value in values]
+            columns.append(builder(name, *values))
+        return newTable(*columns)
+
+    def _add_flush_table(self, key, table, row_count):
+        """
+        Adds the table of a flush to the writer's table. Called while holding the writer's lock.
+        """
+        self._table_map.put(key, table)
+
+    def flush(self):
+        """
+        Writes every buffered row to the table as one columnar table. Flushes from other threads sharing the writer
+        wait on the writer's lock, so their rows aren't interleaved with these.
+
+        Returns:
+            int: The number of rows written.
+        """
+        with self._lock:
+            rows = self._rows
+            row_count = len(rows)
+            if row_count == 0:
+                return 0
+            self._rows = []
+
+            self._add_flush_table(self._stats["flushes"], self._new_flush_table(rows), row_count)
+
+            self._stats["rows"] += row_count
+            self._stats["flushes"] += 1
+            return row_count
+
+    def getTable(self):
+        return self._table
+
+    def stats(self):
+        """
+        Reports how many rows have been written, and in how many flushes.
+
+        Returns:
+            dict: A dictionary with the "rows", "flushes", "rows_per_flush", and "skipped_rows" values.
+        """
+        with self._lock:
+            flushes = self._stats["flushes"]
+            return {
+                "rows": self._stats["rows"],
+                "flushes": flushes,
+                "rows_per_flush": self._stats["rows"] / flushes if flushes else 0.0,
+                "skipped_rows": self._stats["skipped_rows"]
+            }
@@ -1,3 +1,4 @@
 from deephaven import Aggregation as agg, as_list
 
-url_counts = podcast_feeds.aggBy(as_list([agg.AggCountDistinct("RssFeedUrl")]), "RssFeedUrl").sumBy()
+#Count the int FeedId column instead of the URL strings, the rss_feed_ids table maps the IDs back to URLs
+url_counts = podcast_feeds.aggBy(as_list([agg.AggCountDistinct("RssFeedUrl = FeedId")]))
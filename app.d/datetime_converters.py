@@ -0,0 +1,111 @@
+"""
+datetime_converters.py
+
+Defines fast RSS datetime converters. Entry datetimes are converted straight to nanoseconds since the epoch, honoring
+the timezone offset in the entry, instead of being formatted back to a string and reparsed by Deephaven.
+
+The first format that parses a feed's datetimes is remembered for that feed, so later entries skip trying the other
+formats and only fall back to generic parsing if the feed changes format.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from deephaven.DateTimeUtils import nanosToTime
+
+from dateutil import parser, tz
+
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=tz.UTC)
+
+def _parse_iso8601(value):
+    """
+    Parses ISO 8601 datetimes like 2021-12-01T10:00:00+00:00, which Reddit uses
+    """
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+def _parse_rfc822(value):
+    """
+    Parses RFC 822 datetimes like Wed, 01 Dec 2021 10:00:00 +0000, which most RSS 2.0 feeds use
+    """
+    dt = parsedate_to_datetime(value)
+    if dt is None:
+        raise ValueError(f"Invalid RFC 822 datetime {value}")
+    return dt
+
+#The datetime formats to try, in order. The generic parser handles anything the others can't, but is much slower.
+_DATETIME_PARSERS = [
+    ("iso8601", _parse_iso8601),
+    ("rfc822", _parse_rfc822),
+    ("generic", parser.parse)
+]
+_DATETIME_PARSERS_BY_NAME = dict(_DATETIME_PARSERS)
+
+#The name of the format that last parsed each (feed, entry field), used to skip the other formats
+_feed_datetime_formats = {}
+
+def datetime_to_nanos(dt, default_tz=tz.UTC):
+    """
+    Converts a Python datetime to nanoseconds since the epoch.
+
+    Parameters:
+        dt (datetime): The datetime to convert.
+        default_tz (tzinfo): The timezone to use if the datetime doesn't have one.
+
+    Returns:
+        int: The number of nanoseconds since the epoch.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=default_tz)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000000 + delta.microseconds * 1000
+
+def entry_datetime_nanos(entry, field, default_tz=tz.UTC):
+    """
+    Converts a datetime field of an RSS entry to nanoseconds since the epoch.
+
+    Parameters:
+        entry (dict): The RSS entry.
+        field (str): The name of the datetime field, such as "published" or "updated".
+        default_tz (tzinfo): The timezone to use if the datetime doesn't have an offset.
+
+    Returns:
+        int: The number of nanoseconds since the epoch.
+    """
+    value = entry[field]
+    format_key = (entry.get("title_detail", {}).get("base"), field)
+
+    #Try the format that worked last time for this feed first
+    format_name = _feed_datetime_formats.get(format_key)
+    if format_name is not None:
+        try:
+            return datetime_to_nanos(_DATETIME_PARSERS_BY_NAME[format_name](value), default_tz)
+        except (ValueError, TypeError, OverflowError):
+            pass
+
+    for (format_name, parse) in _DATETIME_PARSERS:
+        try:
+            dt = parse(value)
+        except (ValueError, TypeError, OverflowError):
+            continue
+        _feed_datetime_formats[format_key] = format_name
+        return datetime_to_nanos(dt, default_tz)
+
+    raise ValueError(f"Unable to parse datetime {value}")
+
+def entry_datetime(entry, field, default_tz=tz.UTC):
+    """
+    Converts a datetime field of an RSS entry to a Deephaven datetime object.
+
+    Parameters:
+        entry (dict): The RSS entry.
+        field (str): The name of the datetime field, such as "published" or "updated".
+        default_tz (tzinfo): The timezone to use if the datetime doesn't have an offset.
+
+    Returns:
+        DateTime: The Deephaven datetime object.
+    """
+    return nanosToTime(entry_datetime_nanos(entry, field, default_tz))
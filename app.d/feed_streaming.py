@@ -0,0 +1,138 @@
+"""
+feed_streaming.py
+
+Defines an incremental RSS/Atom parser for read_rss_continual. Entries are parsed one at a time as the feed is
+downloaded, so the reader can stop downloading and parsing as soon as it reaches an entry it has already seen, instead
+of parsing hundreds of old podcast episodes to find one or two new ones.
+
+Only the entry fields the readers use are extracted. Feeds that aren't well formed XML fall back to feedparser.
+open_feed is also used to download feeds that are parsed with feedparser, so every pull uses the same conditional GET.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in http_fetcher.py or read_rss.py.
+"""
+from urllib.parse import urljoin
+
+import io
+import xml.etree.ElementTree as ET
+
+#The element names of entries in RSS and Atom feeds
+_ENTRY_TAGS = {"item", "entry"}
+
+#Element names that are copied to the entry as text, renamed to match feedparser's entry keys
+_TEXT_FIELDS = {
+    "title": "title",
+    "pubDate": "published",
+    "published": "published",
+    "updated": "updated",
+    "date": "updated",
+    "description": "summary",
+    "summary": "summary",
+    "duration": "itunes_duration",
+    "creator": "author"
+}
+
+class _RecordingStream:
+    """
+    A file-like wrapper that keeps the bytes read so far, so a feed can be handed to feedparser if it isn't well formed
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        self.buffer = io.BytesIO()
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self.buffer.write(data)
+        return data
+
+    def read_all(self):
+        """
+        Reads the rest of the stream, and returns every byte read from it
+        """
+        self.buffer.write(self._stream.read())
+        return self.buffer.getvalue()
+
+def _local_name(tag):
+    """
+    Removes the namespace from an element name
+    """
+    return tag.rsplit("}", 1)[-1]
+
+def _element_text(element):
+    return (element.text or "").strip()
+
+def _element_to_entry(element, base_url):
+    """
+    Converts an RSS item or Atom entry element to a dictionary shaped like a feedparser entry
+    """
+    entry = {"title_detail": {"base": base_url}}
+    for child in element:
+        tag = _local_name(child.tag)
+        if tag == "link":
+            #Atom links are in the href attribute, and the alternate link is the entry's link
+            if child.get("href") is None:
+                entry.setdefault("link", _element_text(child))
+            elif child.get("rel", "alternate") == "alternate":
+                entry.setdefault("link", child.get("href"))
+        elif tag == "enclosure":
+            entry.setdefault("enclosures", []).append({
+                "href": child.get("url"),
+                "type": child.get("type"),
+                "length": child.get("length")
+            })
+        elif tag == "author":
+            names = [_element_text(name) for name in child if _local_name(name.tag) == "name"]
+            entry["author"] = names[0] if names else _element_text(child)
+        elif tag in ("guid", "id"):
+            #feedparser resolves IDs against the feed's URL unless they're marked as not being permalinks, so the entry
+            #keys of both parsers match
+            entry_id = _element_text(child)
+            is_permalink = {name.lower(): value for (name, value) in child.attrib.items()}.get("ispermalink", "true")
+            if entry_id and is_permalink.strip().lower() != "false":
+                entry_id = urljoin(base_url, entry_id)
+            entry.setdefault("id", entry_id)
+        elif tag in _TEXT_FIELDS:
+            entry.setdefault(_TEXT_FIELDS[tag], _element_text(child))
+    return entry
+
+def open_feed(feed_state):
+    """
+    Opens an RSS feed using a conditional GET with the feed's fetcher.
+
+    Returns:
+        FetchResponse: The response, which must be closed, or None if the feed hasn't changed since the last pull.
+    """
+    response = feed_state["fetcher"].fetch(feed_state["url"], etag=feed_state["etag"], modified=feed_state["modified"])
+    if response.status == 304:
+        response.close()
+        return None
+
+    if response.headers.get("ETag"):
+        feed_state["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        feed_state["modified"] = response.headers["Last-Modified"]
+    return response
+
+def iter_feed_entries(stream, base_url):
+    """
+    Parses the entries of an RSS or Atom feed one at a time. Elements are discarded once their entry has been
+    yielded, so memory use doesn't grow with the size of the feed.
+
+    Parameters:
+        stream (file): A file-like object with the feed body.
+        base_url (str): The URL of the feed, stored in the entries' title_detail base like feedparser does.
+
+    Returns:
+        generator: A generator of entry dictionaries, in the order they appear in the feed.
+    """
+    parents = []
+    for (event, element) in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+
+        parents.pop()
+        if _local_name(element.tag) in _ENTRY_TAGS:
+            yield _element_to_entry(element, base_url)
+            if parents:
+                parents[-1].remove(element)
@@ -3,26 +3,18 @@ helper_functions.py
 
 A file that defines some shared helper functions and imports for the RSS readers.
 """
-from deephaven.DateTimeUtils import convertDateTime
+from dateutil import tz
 
-from dateutil import parser
-
-from datetime import datetime
+_NEW_YORK = tz.gettz("America/New_York")
 
 def datetime_converter_reddit(entry):
-    dt = datetime.fromisoformat(entry["updated"])
-    dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " UTC"
-    return convertDateTime(dts)
+    return entry_datetime(entry, "updated")
 
 def datetime_converter_hackernews(entry):
-    dt = parser.parse(entry["published"])
-    dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " UTC"
-    return convertDateTime(dts)
+    return entry_datetime(entry, "published")
 
 def datetime_converter_seeking_alpha(entry):
-    dt = parser.parse(entry["published"])
-    dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " NY"
-    return convertDateTime(dts)
+    return entry_datetime(entry, "published", default_tz=_NEW_YORK)
 
 def rss_attributes_method_reddit(entry):
     return (entry["title"], datetime_converter_reddit(entry), entry["title_detail"]["base"])
@@ -0,0 +1,372 @@
+"""
+http_fetcher.py
+
+Defines the HTTP fetcher used by the RSS readers. Connections are kept alive and pooled per host, so polling a feed
+doesn't pay for a new TCP and TLS handshake every time. Responses are negotiated with gzip and deflate and decompressed
+as they're read. Requests to each host are limited by a token bucket, and hosts that answer with a 429 or 503 and a
+Retry-After header aren't sent any more requests until the time they asked for has passed.
+
+Fetchers are pluggable. Anything with a fetch(url, etag=None, modified=None) method that returns a response like
+FetchResponse can be passed to read_rss_continual or read_rss_static.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+import feedparser
+
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
+
+import http.client
+import ssl
+import threading
+import time
+import zlib
+
+FETCHER_USER_AGENT = f"deephaven-rss-sentiment-analysis feedparser/{feedparser.__version__}"
+
+#How long to wait on a feed before giving up
+FETCHER_TIMEOUT = 30
+
+#The default number of requests per second, and the burst size, allowed to a single host
+FETCHER_HOST_RATE = 5.0
+FETCHER_HOST_BURST = 10
+
+#Hosts with stricter limits than the default. Reddit answers unauthenticated clients with 429s well before the default.
+FETCHER_HOST_RATE_LIMITS = {
+    "www.reddit.com": (1.0, 3)
+}
+
+#The most idle connections kept open to a single host
+_MAX_IDLE_CONNECTIONS_PER_HOST = 4
+
+_MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+#How long to wait on a host that answers with a 429 or 503 without a Retry-After header
+_DEFAULT_RETRY_AFTER = 60
+
+class HttpStatusError(Exception):
+    """
+    Raised when a feed is answered with an HTTP error status
+    """
+    def __init__(self, code, url):
+        super().__init__(f"HTTP {code} from {url}")
+        self.code = code
+        self.url = url
+
+class RetryAfterError(HttpStatusError):
+    """
+    Raised when a host has asked not to be sent requests for a while. retry_after is the number of seconds to wait.
+    The code is None if the request wasn't sent because the host is still waiting out an earlier Retry-After.
+    """
+    def __init__(self, code, url, retry_after):
+        super().__init__(code, url)
+        self.retry_after = retry_after
+        if code is None:
+            self.args = (f"Waiting {retry_after:.0f}s on a Retry-After before requesting {url}",)
+
+def _parse_retry_after(value):
+    """
+    Converts a Retry-After header, either a number of seconds or an HTTP date, to a number of seconds
+    """
+    if not value:
+        return _DEFAULT_RETRY_AFTER
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return _DEFAULT_RETRY_AFTER
+
+class _TokenBucket:
+    """
+    A token bucket that allows rate requests per second on average, and up to burst requests at once
+    """
+    def __init__(self, rate, burst):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting for one if the bucket is empty.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0 if self._tokens >= 0 else -self._tokens / self._rate
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class FetchResponse:
+    """
+    A response from PooledHttpFetcher. The body is decompressed as it's read, and the connection goes back to the pool
+    when the response is closed after the whole body has been read.
+    """
+    def __init__(self, fetcher, host_key, connection, response, url):
+        self._fetcher = fetcher
+        self._host_key = host_key
+        self._connection = connection
+        self._response = response
+        self._url = url
+        self.status = response.status
+        self.headers = response.headers
+
+        encoding = (response.headers.get("Content-Encoding") or "").lower()
+        self._decompressor = None
+        if encoding == "gzip":
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._decompressor = zlib.decompressobj()
+        self._buffer = b""
+        self._eof = False
+
+    def geturl(self):
+        return self._url
+
+    def _read_chunk(self, size):
+        """
+        Reads and decompresses the next chunk of the body. Returns b"" only at the end of the body.
+        """
+        while True:
+            raw = self._response.read(size) if size > 0 else self._response.read()
+            if not raw:
+                self._eof = True
+                return self._decompressor.flush() if self._decompressor is not None else b""
+            if self._decompressor is None:
+                return raw
+            try:
+                data = self._decompressor.decompress(raw)
+            except zlib.error:
+                #Some servers send raw deflate data without the zlib header
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = self._decompressor.decompress(raw)
+            if data:
+                return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = [self._buffer]
+            self._buffer = b""
+            while not self._eof:
+                chunks.append(self._read_chunk(-1))
+            return b"".join(chunks)
+
+        while len(self._buffer) < size and not self._eof:
+            self._buffer += self._read_chunk(size)
+        (data, self._buffer) = (self._buffer[:size], self._buffer[size:])
+        return data
+
+    def close(self):
+        """
+        Returns the connection to the pool if the whole body was read, otherwise closes it
+        """
+        if self._connection is None:
+            return
+        reusable = self._eof and not self._response.will_close
+        if not reusable:
+            self._response.close()
+        self._fetcher._release(self._host_key, self._connection, reusable)
+        self._connection = None
+
+class PooledHttpFetcher:
+    """
+    Fetches feeds over keep-alive connections pooled per host, with per-host rate limits and Retry-After handling
+    """
+    def __init__(self, user_agent=FETCHER_USER_AGENT, timeout=FETCHER_TIMEOUT, host_rate=FETCHER_HOST_RATE,
+            host_burst=FETCHER_HOST_BURST, host_rate_limits=None):
+        """
+        Parameters:
+            user_agent (str): The User-Agent header to send.
+            timeout (float): The number of seconds to wait on a host before giving up.
+            host_rate (float): The default number of requests per second allowed to a single host.
+            host_burst (int): The default number of requests allowed to a single host at once.
+            host_rate_limits (dict): A dictionary of host name to (rate, burst) tuples for hosts with different limits.
+                Defaults to FETCHER_HOST_RATE_LIMITS.
+        """
+        self._user_agent = user_agent
+        self._timeout = timeout
+        self._host_rate = host_rate
+        self._host_burst = host_burst
+        self._host_rate_limits = FETCHER_HOST_RATE_LIMITS if host_rate_limits is None else host_rate_limits
+        self._ssl_context = ssl.create_default_context()
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host_key):
+        """
+        Gets the pool, token bucket, and stats of a host, creating them the first time the host is fetched from
+        """
+        with self._lock:
+            host = self._hosts.get(host_key)
+            if host is None:
+                (rate, burst) = self._host_rate_limits.get(host_key[1], (self._host_rate, self._host_burst))
+                host = {
+                    "idle_connections": [],
+                    "token_bucket": _TokenBucket(rate, burst),
+                    "blocked_until": 0,
+                    "requests": 0,
+                    "connections_opened": 0,
+                    "connections_reused": 0,
+                    "rate_limited_seconds": 0.0,
+                    "retry_afters": 0
+                }
+                self._hosts[host_key] = host
+            return host
+
+    def _connect(self, host_key):
+        (scheme, hostname, port) = host_key
+        if scheme == "https":
+            return http.client.HTTPSConnection(hostname, port, timeout=self._timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(hostname, port, timeout=self._timeout)
+
+    def _release(self, host_key, connection, reusable):
+        host = self._host(host_key)
+        with self._lock:
+            if reusable and len(host["idle_connections"]) < _MAX_IDLE_CONNECTIONS_PER_HOST:
+                host["idle_connections"].append(connection)
+                return
+        connection.close()
+
+    def _request(self, host_key, path, headers):
+        """
+        Sends a request on a pooled connection, retrying once on a new connection if the pooled one was closed by the
+        server while it was idle.
+        """
+        host = self._host(host_key)
+        with self._lock:
+            connection = host["idle_connections"].pop() if host["idle_connections"] else None
+            host["requests"] += 1
+            if connection is None:
+                host["connections_opened"] += 1
+            else:
+                host["connections_reused"] += 1
+
+        if connection is not None:
+            try:
+                connection.request("GET", path, headers=headers)
+                return (connection, connection.getresponse())
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                with self._lock:
+                    host["connections_opened"] += 1
+
+        connection = self._connect(host_key)
+        try:
+            connection.request("GET", path, headers=headers)
+            return (connection, connection.getresponse())
+        except Exception:
+            connection.close()
+            raise
+
+    def fetch(self, url, etag=None, modified=None):
+        """
+        Fetches a URL with a conditional GET, following redirects.
+
+        Parameters:
+            url (str): The URL to fetch.
+            etag (str): The ETag of the last response, sent as If-None-Match.
+            modified (str): The Last-Modified value of the last response, sent as If-Modified-Since.
+
+        Returns:
+            FetchResponse: The response, with a status of 200 or 304. The response must be closed.
+        """
+        headers = {"User-Agent": self._user_agent, "Accept-Encoding": "gzip, deflate"}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            host_key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+            host = self._host(host_key)
+
+            #Don't send anything to a host that's still waiting out a Retry-After
+            blocked_for = host["blocked_until"] - time.time()
+            if blocked_for > 0:
+                raise RetryAfterError(None, url, blocked_for)
+
+            waited = host["token_bucket"].acquire()
+            with self._lock:
+                host["rate_limited_seconds"] += waited
+
+            path = parts.path or "/"
+            if parts.query:
+                path += f"?{parts.query}"
+            (connection, response) = self._request(host_key, path, headers)
+            fetch_response = FetchResponse(self, host_key, connection, response, url)
+
+            if response.status in _REDIRECT_STATUSES and response.headers.get("Location"):
+                fetch_response.read()
+                fetch_response.close()
+                url = urljoin(url, response.headers["Location"])
+                continue
+
+            if response.status in (429, 503):
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                with self._lock:
+                    host["blocked_until"] = max(host["blocked_until"], time.time() + retry_after)
+                    host["retry_afters"] += 1
+                fetch_response.read()
+                fetch_response.close()
+                raise RetryAfterError(response.status, url, retry_after)
+
+            if response.status >= 400:
+                fetch_response.read()
+                fetch_response.close()
+                raise HttpStatusError(response.status, url)
+
+            return fetch_response
+
+        raise HttpStatusError(response.status, url)
+
+    def fetch_bytes(self, url):
+        """
+        Fetches the whole body of a URL.
+
+        Returns:
+            (bytes, FetchResponse): The body, and the closed response.
+        """
+        response = self.fetch(url)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        return (body, response)
+
+    def stats(self):
+        """
+        Reports the connection reuse and rate limiting of every host.
+
+        Returns:
+            dict: A dictionary of host name to a dictionary with the number of "requests", "connections_opened",
+                "connections_reused", "idle_connections", the "rate_limited_seconds" spent waiting on the host's token
+                bucket, and the number of "retry_afters" the host has sent.
+        """
+        with self._lock:
+            return {
+                host_key[1]: {
+                    "requests": host["requests"],
+                    "connections_opened": host["connections_opened"],
+                    "connections_reused": host["connections_reused"],
+                    "idle_connections": len(host["idle_connections"]),
+                    "rate_limited_seconds": host["rate_limited_seconds"],
+                    "retry_afters": host["retry_afters"]
+                }
+                for (host_key, host) in self._hosts.items()
+            }
+
+#The fetcher used by the readers unless they're given their own
+default_fetcher = PooledHttpFetcher()
@@ -0,0 +1,166 @@
+"""
+model_store.py
+
+Defines a store for trained models and NLTK data on the mounted /cache volume. Models are saved under a hash of the
+NLTK data they're trained on and the code that builds them, and are only rebuilt when one of those changes. Models are
+loaded lazily the first time they're used, so they don't slow down starting the app.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+import nltk
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import types
+
+MODEL_STORE_DIR = "/cache/models"
+NLTK_DATA_DIR = "/cache/nltk_data"
+
+if NLTK_DATA_DIR not in nltk.data.path:
+    nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+def ensure_nltk_data(nltk_resources):
+    """
+    Downloads NLTK data to the cache volume if it isn't there already.
+
+    Parameters:
+        nltk_resources (dict): A dictionary of NLTK package IDs to their resource paths, such as
+            {"movie_reviews": "corpora/movie_reviews"}.
+
+    Returns:
+        list<str>: The paths of the NLTK data on disk.
+    """
+    paths = []
+    for (package_id, resource_path) in nltk_resources.items():
+        try:
+            pointer = nltk.data.find(resource_path)
+        except LookupError:
+            nltk.download(package_id, download_dir=NLTK_DATA_DIR, quiet=True)
+            pointer = nltk.data.find(resource_path)
+
+        #Resources can be found either as a directory on disk, or inside a zip file
+        if hasattr(pointer, "zipfile"):
+            paths.append(pointer.zipfile.filename)
+        else:
+            paths.append(pointer.path)
+    return paths
+
+def _hash_path(digest, path):
+    """
+    Adds the contents of a file, or every file in a directory, to a hash
+    """
+    if os.path.isdir(path):
+        for (dir_path, dir_names, file_names) in os.walk(path):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                digest.update(os.path.relpath(file_path, path).encode("utf-8"))
+                _hash_path(digest, file_path)
+    else:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+def _code_version(build_func):
+    """
+    Computes a hash of the code of a build method, so models are rebuilt when the method changes
+    """
+    code = getattr(build_func, "__code__", None)
+
+    #Classes and other callables from libraries are versioned by the version of their library
+    if code is None:
+        library = sys.modules.get(build_func.__module__.split(".")[0])
+        return f"{build_func.__module__}.{build_func.__qualname__}-{getattr(library, '__version__', '')}"
+
+    digest = hashlib.sha256()
+    _hash_code(digest, code)
+    return digest.hexdigest()
+
+def _hash_code(digest, code):
+    """
+    Adds the bytecode, names, and constants of a code object to a hash, along with those of the functions, lambdas,
+    and comprehensions nested in it. The repr of a code object includes its address, and the repr of a frozenset
+    depends on the string hash seed, so neither is used, to keep the hash the same in every process.
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        _hash_const(digest, const)
+
+def _hash_const(digest, const):
+    if isinstance(const, types.CodeType):
+        _hash_code(digest, const)
+    elif isinstance(const, (tuple, frozenset)):
+        digest.update(type(const).__name__.encode("utf-8"))
+        items = sorted(const, key=repr) if isinstance(const, frozenset) else const
+        for item in items:
+            _hash_const(digest, item)
+    else:
+        digest.update(repr(const).encode("utf-8") + b",")
+
+def load_or_build_model(name, build_func, nltk_resources=None, version=None):
+    """
+    Loads a model from the model store, or builds and saves it if the store doesn't have a model built from the
+    same NLTK data and code.
+
+    Parameters:
+        name (str): The name of the model.
+        build_func (method): A method with no arguments that builds the model.
+        nltk_resources (dict): A dictionary of NLTK package IDs to the resource paths the model is built from.
+        version (str): An optional version to bump when code the build method calls changes.
+
+    Returns:
+        object: The model.
+    """
+    digest = hashlib.sha256(f"{_code_version(build_func)}-{version}".encode("utf-8"))
+    for path in ensure_nltk_data(nltk_resources or {}):
+        _hash_path(digest, path)
+    model_path = os.path.join(MODEL_STORE_DIR, f"{name}-{digest.hexdigest()[:16]}.pickle")
+
+    if os.path.exists(model_path):
+        try:
+            with open(model_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Unable to load model {model_path}, rebuilding it")
+            print(e)
+
+    model = build_func()
+
+    #Write to a temporary file first so a crash never leaves a partial model behind
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    temp_path = f"{model_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, model_path)
+    return model
+
+class LazyModel:
+    """
+    A model that's loaded from the model store the first time one of its attributes is used
+    """
+    def __init__(self, name, build_func, nltk_resources=None, version=None):
+        self._name = name
+        self._build_func = build_func
+        self._nltk_resources = nltk_resources
+        self._version = version
+        self._model = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns the model, loading or building it if needed
+        """
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_or_build_model(self._name, self._build_func, self._nltk_resources,
+                                                      self._version)
+        return self._model
+
+    def __getattr__(self, attribute):
+        return getattr(self.get(), attribute)
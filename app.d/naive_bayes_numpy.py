@@ -0,0 +1,99 @@
+"""
+naive_bayes_numpy.py
+
+Defines a compact NumPy version of a trained NLTK NaiveBayesClassifier. The model is exported to a vocabulary index
+and dense arrays of log probabilities, and a whole batch of strings is classified with one sparse matrix product
+instead of walking NLTK's nested probability distributions for every word of every string.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+import numpy as np
+
+import sys
+
+#Bump this when the exported model format changes, so stored models are exported again
+NUMPY_MODEL_VERSION = 1
+
+#NLTK's log probability for a feature that was never seen with a label
+_NLTK_NEGATIVE_INFINITY = -1e300
+
+def export_naive_bayes(classifier):
+    """
+    Exports a trained NLTK NaiveBayesClassifier that was trained on word features with the value True.
+
+    Parameters:
+        classifier (NaiveBayesClassifier): The trained classifier.
+
+    Returns:
+        dict: The exported model, with the "labels", the "vocabulary" of word to column index, the "label_log_probs"
+            array with one log probability per label, and the "feature_log_probs" array with one row per label and
+            one column per word.
+    """
+    #NLTK breaks ties by picking the largest label, and argmax picks the first, so keep the labels largest first
+    labels = sorted(classifier.labels(), reverse=True)
+    label_indexes = {label: i for (i, label) in enumerate(labels)}
+    words = sorted({word for (label, word) in classifier._feature_probdist})
+    vocabulary = {word: i for (i, word) in enumerate(words)}
+
+    feature_log_probs = np.full((len(labels), len(words)), _NLTK_NEGATIVE_INFINITY)
+    for ((label, word), probdist) in classifier._feature_probdist.items():
+        feature_log_probs[label_indexes[label], vocabulary[word]] = probdist.logprob(True)
+
+    label_log_probs = np.array([classifier._label_probdist.logprob(label) for label in labels])
+
+    return {
+        "labels": labels,
+        "vocabulary": vocabulary,
+        "label_log_probs": label_log_probs,
+        "feature_log_probs": feature_log_probs
+    }
+
+def build_numpy_model_batch_func(model):
+    """
+    Generates a method that classifies a batch of strings using an exported Naive Bayes model. Strings are split
+    into words the same way as _word_feats_string, so the labels match the NLTK classifier.
+    """
+    def a(strns):
+        exported = model if isinstance(model, dict) else model.get()
+        vocabulary = exported["vocabulary"]
+        feature_log_probs = exported["feature_log_probs"]
+
+        #Build the sparse (string, word) matrix as row and column indexes, ignoring words the model hasn't seen
+        rows = []
+        columns = []
+        for (i, strn) in enumerate(strns):
+            for word in set(strn.split(" ")):
+                column = vocabulary.get(word)
+                if column is not None:
+                    rows.append(i)
+                    columns.append(column)
+
+        rows = np.array(rows, dtype=np.intp)
+        columns = np.array(columns, dtype=np.intp)
+
+        scores = np.empty((len(exported["labels"]), len(strns)))
+        for (label_index, label_log_prob) in enumerate(exported["label_log_probs"]):
+            scores[label_index] = label_log_prob + np.bincount(rows, weights=feature_log_probs[label_index, columns],
+                                                               minlength=len(strns))
+
+        labels = exported["labels"]
+        return [labels[label_index] for label_index in scores.argmax(axis=0)]
+    return a
+
+def build_numpy_model_func(model):
+    """
+    Generates a method that classifies a single string using an exported Naive Bayes model
+    """
+    classify_batch = build_numpy_model_batch_func(model)
+    def a(strn):
+        return classify_batch([strn])[0]
+    return a
+
+def numpy_model_size(model):
+    """
+    Approximates the number of bytes used by an exported Naive Bayes model
+    """
+    exported = model if isinstance(model, dict) else model.get()
+    return (exported["feature_log_probs"].nbytes + exported["label_log_probs"].nbytes +
+            sys.getsizeof(exported["vocabulary"]) + sum(sys.getsizeof(word) for word in exported["vocabulary"]))
@@ -0,0 +1,385 @@
+"""
+payload_archive.py
+
+Defines a record-and-replay archive of the raw payloads fetched by the RSS readers. Every payload is appended, with the
+time it was fetched, to a compressed append-only archive on the mounted /data volume. replay_rss_archive() feeds the
+archive back through the same parse, convert, score, and write steps as read_rss_continual, as fast as possible or at
+a scaled real time, so new classifiers and attributes methods can be tried on months of old data, and the readers can
+be load tested offline.
+
+The archive is a directory of segment files, one per hour and run of the reader. Each record is a header with the
+lengths of the record's metadata and payload, the metadata as JSON, and the payload compressed with zlib. A crash can
+only leave a partial record at the end of a segment, which is skipped when the archive is read, and a restarted reader
+starts new segments.
+
+Payloads of feeds read with streaming=True are only recorded up to where the reader stopped reading them, since the
+rest is entries that were already written. They're replayed with the same incremental parser, so their entries get the
+same keys as when they were recorded, and the replay stops cleanly at the end of the recorded data instead of parsing
+the cut off entry there.
+
+The archive directory is set by the RSS_PAYLOAD_ARCHIVE_DIR environment variable.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from datetime import datetime, timezone
+
+import glob
+import io
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+PAYLOAD_ARCHIVE_DIR = os.environ.get("RSS_PAYLOAD_ARCHIVE_DIR", "/data/rss-payloads")
+
+#The lengths of a record's metadata and compressed payload
+_RECORD_HEADER = struct.Struct("<II")
+
+#The stats of every replay, most recent last
+_replay_stats = []
+_replay_stats_lock = threading.Lock()
+
+def _segment_hour(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y%m%d%H")
+
+class PayloadArchive:
+    """
+    An append-only archive of fetched payloads, split into one segment file per hour
+    """
+    def __init__(self, archive_dir=PAYLOAD_ARCHIVE_DIR):
+        """
+        Parameters:
+            archive_dir (str): The directory of the archive. It's created when the first payload is appended.
+        """
+        self.archive_dir = archive_dir
+
+        #Segments are never appended to after a restart, since the last record before the restart may be partial
+        self._run_id = int(time.time() * 1000)
+        self._segment = None
+        self._segment_hour = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "records": 0,
+            "payload_bytes": 0,
+            "archived_bytes": 0
+        }
+
+    def append(self, url, payload, fetch_time=None, base_url=None, content_type="", streamed=False, partial=False):
+        """
+        Appends a payload to the archive.
+
+        Parameters:
+            url (str): The URL the payload was fetched from.
+            payload (bytes): The payload, after any Content-Encoding was decoded.
+            fetch_time (float): When the payload was fetched, in seconds since the epoch. Defaults to now.
+            base_url (str): The URL the payload was finally served from, after redirects. Defaults to url.
+            content_type (str): The Content-Type header of the response.
+            streamed (bool): Whether the payload was read by the incremental parser.
+            partial (bool): Whether the payload was only read part of the way through.
+        """
+        if fetch_time is None:
+            fetch_time = time.time()
+        metadata = json.dumps({
+            "url": url,
+            "base_url": base_url or url,
+            "fetch_time": fetch_time,
+            "content_type": content_type,
+            "streamed": streamed,
+            "partial": partial
+        }, separators=(",", ":")).encode("utf-8")
+        compressed = zlib.compress(payload)
+        record = _RECORD_HEADER.pack(len(metadata), len(compressed)) + metadata + compressed
+
+        with self._lock:
+            hour = _segment_hour(fetch_time)
+            if hour != self._segment_hour:
+                if self._segment is not None:
+                    self._segment.close()
+                os.makedirs(self.archive_dir, exist_ok=True)
+                self._segment = open(os.path.join(self.archive_dir, f"payloads-{hour}-{self._run_id}.rec"), "ab")
+                self._segment_hour = hour
+
+            #Each record is written and flushed in one go, so a crash can only cut off the last record
+            self._segment.write(record)
+            self._segment.flush()
+
+            self._stats["records"] += 1
+            self._stats["payload_bytes"] += len(payload)
+            self._stats["archived_bytes"] += len(record)
+
+    def stats(self):
+        """
+        Reports how many payloads have been appended, and how much they were compressed.
+
+        Returns:
+            dict: A dictionary with the number of "records", the "payload_bytes" appended, and the "archived_bytes"
+                written for them.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+def iter_payload_records(archive_dir=PAYLOAD_ARCHIVE_DIR, start_time=None, end_time=None):
+    """
+    Reads the records of an archive, in the order they were appended.
+
+    Parameters:
+        archive_dir (str): The directory of the archive.
+        start_time (float): The earliest fetch time to read, in seconds since the epoch. Defaults to the start.
+        end_time (float): The latest fetch time to read, in seconds since the epoch. Defaults to the end.
+
+    Returns:
+        generator<dict>: The records, each a dictionary with the "url", "base_url", "fetch_time", "content_type",
+            "streamed", "partial", and "payload" of a fetch.
+    """
+    start_hour = None if start_time is None else _segment_hour(start_time)
+    end_hour = None if end_time is None else _segment_hour(end_time)
+    for path in sorted(glob.glob(os.path.join(archive_dir, "payloads-*.rec"))):
+        hour = os.path.basename(path)[len("payloads-"):].split("-")[0]
+        if (start_hour is not None and hour < start_hour) or (end_hour is not None and hour > end_hour):
+            continue
+
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                (metadata_length, payload_length) = _RECORD_HEADER.unpack(header)
+                data = f.read(metadata_length + payload_length)
+                if len(data) < metadata_length + payload_length:
+                    print(f"Skipping the partial record at the end of {path}")
+                    break
+
+                try:
+                    record = json.loads(data[:metadata_length])
+                    if start_time is not None and record["fetch_time"] < start_time:
+                        continue
+                    if end_time is not None and record["fetch_time"] > end_time:
+                        continue
+                    record["payload"] = zlib.decompress(data[metadata_length:])
+                except (ValueError, KeyError, zlib.error) as e:
+                    print(f"Skipping the rest of {path}, which has a corrupt record")
+                    print(e)
+                    break
+                yield record
+
+class _RecordingResponse:
+    """
+    A response that keeps the bytes read from it, and appends them to an archive when it's closed
+    """
+    def __init__(self, response, archive, url, fetch_time):
+        self._response = response
+        self._archive = archive
+        self._url = url
+        self._fetch_time = fetch_time
+        self._buffer = io.BytesIO()
+        self._streamed = False
+        self._complete = False
+        self.status = response.status
+        self.headers = response.headers
+
+    def geturl(self):
+        return self._response.geturl()
+
+    def read(self, size=-1):
+        data = self._response.read(size)
+        self._buffer.write(data)
+        if size is None or size < 0 or not data:
+            self._complete = True
+        else:
+            self._streamed = True
+        return data
+
+    def close(self):
+        self._response.close()
+        if self._archive is None or self.status != 200:
+            return
+        archive = self._archive
+        self._archive = None
+        try:
+            archive.append(self._url, self._buffer.getvalue(), fetch_time=self._fetch_time, base_url=self.geturl(),
+                           content_type=self.headers.get("Content-Type", ""), streamed=self._streamed,
+                           partial=not self._complete)
+        except Exception as e:
+            print(f"Unable to archive the payload of {self._url}")
+            print(e)
+
+class RecordingFetcher:
+    """
+    A fetcher that appends every payload fetched by another fetcher to a PayloadArchive
+    """
+    def __init__(self, fetcher, archive):
+        """
+        Parameters:
+            fetcher (PooledHttpFetcher): The fetcher to record.
+            archive (PayloadArchive): The archive to append the payloads to.
+        """
+        self._fetcher = fetcher
+        self._archive = archive
+
+    def fetch(self, url, etag=None, modified=None):
+        fetch_time = time.time()
+        return _RecordingResponse(self._fetcher.fetch(url, etag, modified), self._archive, url, fetch_time)
+
+    def fetch_bytes(self, url):
+        response = self.fetch(url)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        return (body, response)
+
+#The archive read_rss_continual appends to when archive_payloads is set
+default_payload_archive = PayloadArchive()
+
+class _ReplayResponse:
+    """
+    A response that serves an archived payload
+    """
+    def __init__(self, record):
+        self._stream = io.BytesIO(record["payload"])
+        self._base_url = record["base_url"]
+        self.truncated = record["partial"]
+        self.status = 200
+        self.headers = {"Content-Type": record["content_type"]}
+
+    def geturl(self):
+        return self._base_url
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def close(self):
+        pass
+
+class _ReplayFetcher:
+    """
+    A fetcher that answers the next fetch with an archived payload
+    """
+    def __init__(self, record):
+        self._record = record
+
+    def fetch(self, url, etag=None, modified=None):
+        return _ReplayResponse(self._record)
+
+def replay_rss_archive(rss_feed_urls=None, rss_attributes_method=None, rss_datetime_converter=None, column_names=None,
+        column_types=None, speed=None, start_time=None, end_time=None, seen_entry_limit=_DEFAULT_SEEN_ENTRY_LIMIT,
+        streaming=False, projection=None, raw_payload=False, entry_keys=False, table_writer=None,
+        archive_dir=PAYLOAD_ARCHIVE_DIR, wait=False):
+    """
+    This method replays a payload archive into a Deephaven table. Every archived payload goes through the same parse,
+    convert, score, and write steps as a pull of read_rss_continual, with each feed's entries written once.
+
+    The replay runs in a background thread, and has its own state for every feed, so it doesn't affect the live
+    readers of the same feeds. Use rss_replay_stats() to see how fast it ran.
+
+    Parameters:
+        rss_feed_urls (list<str>): The RSS feed URLs to replay. Defaults to every feed in the archive.
+        rss_attributes_method (method): A method that converts an RSS entry to a tuple of values to write.
+        rss_datetime_converter (method): A method that takes an RSS feed entry and converts it to a Deephaven datetime
+            object.
+        column_names (list<str>): A list of column names for the resulting table.
+        column_types (list<dht.type>): A list of column types for the resulting table.
+        speed (float): How many times faster than real time to replay the archive, based on the fetch times of the
+            payloads. Defaults to replaying as fast as possible.
+        start_time (float): The earliest fetch time to replay, in seconds since the epoch. Defaults to the start.
+        end_time (float): The latest fetch time to replay, in seconds since the epoch. Defaults to the end.
+        seen_entry_limit (int): How many entry keys to remember per feed.
+        streaming (bool): Whether to parse every payload with the incremental parser. Payloads recorded from
+            streaming readers are always parsed this way.
+        projection (list<tuple>): Fields of the entries to write to their own typed columns, like read_rss_continual.
+        raw_payload (bool): Whether to also write the whole entry to a RawPayload column. Only used with projection.
+        entry_keys (bool): Whether to add the EntryKey and FeedId columns. Defaults to False.
+        table_writer (BufferedTableWriter): A writer to write the rows to instead of a new table.
+        archive_dir (str): The directory of the archive. Defaults to PAYLOAD_ARCHIVE_DIR.
+        wait (bool): Whether to wait for the replay to finish before returning. Defaults to False.
+
+    Returns:
+        Table: The Deephaven table that will contain the results of the replay.
+    """
+    subscriber_template = _new_subscriber(rss_attributes_method, rss_datetime_converter, column_names, column_types,
+                                          streaming, projection, raw_payload, entry_keys, table_writer, None, None)
+    table_writer = subscriber_template["table_writer"]
+    replayed_urls = None if rss_feed_urls is None else set(rss_feed_urls)
+
+    stats = {
+        "records": 0,
+        "payload_bytes": 0,
+        "rows": 0,
+        "scoring_seconds": 0.0,
+        "seconds": 0.0,
+        "records_per_second": 0.0,
+        "rows_per_second": 0.0,
+        "finished": False
+    }
+    with _replay_stats_lock:
+        _replay_stats.append(stats)
+
+    def replay():
+        feed_states = {}
+        start = time.perf_counter()
+        first_fetch_time = None
+        for record in iter_payload_records(archive_dir, start_time, end_time):
+            url = record["url"]
+            if replayed_urls is not None and url not in replayed_urls:
+                continue
+
+            #Scaled real time waits until the payload is due, relative to the first payload
+            if speed is not None:
+                if first_fetch_time is None:
+                    first_fetch_time = record["fetch_time"]
+                due = (record["fetch_time"] - first_fetch_time) / speed - (time.perf_counter() - start)
+                if due > 0:
+                    time.sleep(due)
+
+            feed_state = feed_states.get(url)
+            if feed_state is None:
+                feed_state = _new_feed_state(url)
+                feed_state["seen_entry_limit"] = seen_entry_limit
+                feed_state["subscribers"] = [dict(subscriber_template, backfill_entries=None)]
+                feed_states[url] = feed_state
+            feed_state["fetcher"] = _ReplayFetcher(record)
+            feed_state["streaming"] = streaming or record["streamed"]
+
+            try:
+                poll_metrics = _new_poll_metrics()
+                (subscriber_rows, _) = _poll_feed(feed_state, poll_metrics)
+                for (subscriber, rows) in subscriber_rows:
+                    table_writer.append_rows(rows)
+                    stats["rows"] += len(rows)
+                table_writer.flush()
+                stats["scoring_seconds"] += poll_metrics["scoring_seconds"]
+            except Exception as e:
+                print(f"Error on replaying RSS feed {url} fetched at {record['fetch_time']}")
+                print(e)
+
+            stats["records"] += 1
+            stats["payload_bytes"] += len(record["payload"])
+            seconds = time.perf_counter() - start
+            stats["seconds"] = seconds
+            stats["records_per_second"] = stats["records"] / seconds if seconds > 0 else 0.0
+            stats["rows_per_second"] = stats["rows"] / seconds if seconds > 0 else 0.0
+
+        stats["finished"] = True
+        print(f"Replayed {stats['rows']} rows from {stats['records']} payloads in {stats['seconds']:.1f}s "
+              f"({stats['records_per_second']:.1f} payloads/sec, {stats['rows_per_second']:.1f} rows/sec)")
+
+    thread = threading.Thread(target=replay, name="rss-replay", daemon=True)
+    thread.start()
+    if wait:
+        thread.join()
+    return table_writer.getTable()
+
+def rss_replay_stats():
+    """
+    Reports the progress of every replay started by replay_rss_archive().
+
+    Returns:
+        list<dict>: One dictionary per replay, oldest first, with the number of "records" and "payload_bytes"
+            replayed, the "rows" written, the "scoring_seconds" and total "seconds" spent, the "records_per_second"
+            and "rows_per_second", and whether the replay has "finished".
+    """
+    with _replay_stats_lock:
+        return [dict(stats) for stats in _replay_stats]
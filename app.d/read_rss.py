@@ -5,25 +5,855 @@ Defines the method for reading from an RSS feed and performing sentiment analysi
 """
 import feedparser
 from deephaven import DynamicTableWriter, Types as dht
-from deephaven.TableTools import merge
-from deephaven.DateTimeUtils import convertDateTime, currentTime
-from dateutil import parser
+from deephaven.DateTimeUtils import currentTime
 
-import time
-import math
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
+
+import asyncio
+import base64
+import hashlib
+import heapq
+import json
+import sys
 import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+
+#How many feeds read_rss_continual fetches at once if neither concurrency nor thread_count is set
+_DEFAULT_CONCURRENCY = 8
+
+#How many entry keys are remembered per feed to skip entries that have already been written
+_DEFAULT_SEEN_ENTRY_LIMIT = 1000
+
+#How many entry publish times are kept per feed to estimate how often it publishes
+_PUBLISH_HISTORY_SIZE = 20
+
+#How many of the newest entries of a streamed feed are kept to backfill tables that subscribe late
+_STREAMING_BACKFILL_SIZE = 100
+
+#One in this many projected rows is also serialized to JSON to measure how many bytes the projection saves
+_PROJECTION_SAMPLE_RATE = 100
+
+#The stats of every projection, keyed by the column names of the table it writes to
+_projection_stats = {}
+_projection_stats_lock = threading.Lock()
+
+#The checkpointed state of feeds from before the last restart, keyed by RSS feed URL. Feeds are restored from it
+#when they're first subscribed to.
+_reader_checkpoints = read_checkpoint(CHECKPOINT_PATH)
+
+#Seconds spent scoring entries on each reader thread, so every pull can report how long it spent scoring
+_scoring_timer = threading.local()
+
+#One row per pull of every feed polled by read_rss_continual, written from the engine's event loop
+_poll_metrics_writer = DynamicTableWriter(
+    ["Timestamp", "RssFeedUrl", "FetchSeconds", "HttpStatus", "PayloadBytes", "ParseSeconds", "NewEntries",
+     "ErrorClass", "ScoringSeconds", "PublishLagSeconds"],
+    [dht.datetime, dht.string, dht.double, dht.int32, dht.int64, dht.double, dht.int32, dht.string, dht.double,
+     dht.double]
+)
+rss_poll_metrics = _poll_metrics_writer.getTable()
+
+#The URL of every FeedId written by read_rss_continual, one row per feed
+_feed_ids_writer = DynamicTableWriter(["FeedId", "RssFeedUrl"], [dht.int32, dht.string])
+rss_feed_ids = _feed_ids_writer.getTable()
+_feed_id_urls = {}
+
+#The most feeds the shared engine will ever fetch at once
+_MAX_CONCURRENCY = 64
+
+#The feed registry, which holds the state of every feed polled by read_rss_continual keyed by RSS feed URL.
+#Every URL is only polled once, and its new entries are written to every table subscribed to it.
+_feed_registry = {}
+_feed_registry_lock = threading.Lock()
+
+#The shared asyncio ingestion engine. The schedule is a priority queue of (next poll time, id, feed state).
+_rss_engine = {
+    "thread": None,
+    "loop": None,
+    "wakeup": None,
+    "schedule": [],
+    "concurrency": 0,
+    "in_flight": 0
+}
 
 def _default_rss_attributes_method(entry):
     return (entry["title"], _default_rss_datetime_converter(entry), entry["title_detail"]["base"])
 
 def _default_rss_datetime_converter(entry):
     try:
-        dt = parser.parse(entry["published"])
-        dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " UTC"
-        return convertDateTime(dts)
+        return entry_datetime(entry, "published")
     except:
         return currentTime()
 
+def _entry_key(entry):
+    """
+    Computes a 64-bit key that identifies an RSS entry. The entry's id (the RSS guid) is used if it has one,
+    otherwise its link, and then its title.
+
+    Returns:
+        int: A signed 64-bit integer key for the entry.
+    """
+    identity = entry.get("id") or entry.get("link") or entry.get("title", "")
+    digest = hashlib.blake2b(identity.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def _feed_id(rss_feed_url):
+    """
+    Computes a 32-bit ID for an RSS feed from its URL. IDs are hashes rather than counters, so they're the same after a
+    restart and in rows rolled off to the archive.
+
+    Returns:
+        int: A signed 32-bit integer ID for the feed.
+    """
+    digest = hashlib.blake2b(rss_feed_url.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def _entry_key_salt(rss_feed_url):
+    """
+    Computes the 64-bit value mixed into the keys of a feed's entries by the EntryKey column, so entries that share
+    an id in different feeds get different keys.
+    """
+    digest = hashlib.blake2b(rss_feed_url.encode("utf-8"), digest_size=8, person=b"rss-entry-key").digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def rss_attributes_method_with_scores(rss_attributes_method, score_method, score_index=0, score_method_batch=None):
+    """
+    Generates an rss_attributes_method that scores one of the attributes when the entry is read, and appends the
+    scores to the row. This writes the scores straight into their own columns in the same row as the entry, instead
+    of adding them to the table afterwards with update().
+
+    If score_method_batch is set, the generated method also has a batch method that read_rss_continual uses to score
+    the new entries of each pull with one call, for example in a ScoringPool.
+
+    Parameters:
+        rss_attributes_method (method): A method that converts an RSS entry to a tuple of values to write.
+        score_method (method): A method that takes the attribute to score and returns a sequence of scores.
+        score_index (int): The index of the attribute to score in the tuple returned by rss_attributes_method.
+        score_method_batch (method): A method that takes a list of attributes and returns one sequence of scores per
+            attribute.
+
+    Returns:
+        method: A method that converts an RSS entry to a tuple of values followed by the scores.
+    """
+    def a(entry):
+        row = tuple(rss_attributes_method(entry))
+        scoring_start = time.perf_counter()
+        scores = tuple(score_method(row[score_index]))
+        _scoring_timer.seconds = getattr(_scoring_timer, "seconds", 0.0) + time.perf_counter() - scoring_start
+        return row + scores
+
+    def batch(entries):
+        rows = [tuple(rss_attributes_method(entry)) for entry in entries]
+        scoring_start = time.perf_counter()
+        scores = score_method_batch([row[score_index] for row in rows])
+        _scoring_timer.seconds = getattr(_scoring_timer, "seconds", 0.0) + time.perf_counter() - scoring_start
+        return [row + tuple(row_scores) for (row, row_scores) in zip(rows, scores)]
+
+    if score_method_batch is not None:
+        a.batch = batch
+    return a
+
+def _entry_path(entry, path):
+    """
+    Looks up a dotted path such as "enclosures.0.href" in an RSS entry. Numbers index into lists.
+
+    Returns:
+        object: The value at the path, or None if any part of the path is missing.
+    """
+    value = entry
+    for part in path.split("."):
+        if isinstance(value, (list, tuple)):
+            if not part.isdigit() or int(part) >= len(value):
+                return None
+            value = value[int(part)]
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+def _value_size(value):
+    """
+    Approximates the number of bytes a value takes up in a table column
+    """
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return 8
+
+def duration_to_seconds(duration):
+    """
+    Converts a podcast duration such as "1:02:03", "62:03", or "3723" to a number of seconds.
+
+    Returns:
+        float: The number of seconds, or None if the duration isn't set.
+    """
+    if not duration:
+        return None
+    seconds = 0.0
+    for part in str(duration).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def encode_raw_payload(entry):
+    """
+    Compresses an RSS entry into a string that can be stored in a table column. Use decode_raw_payload() to get
+    the entry back.
+    """
+    payload = json.dumps(entry, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(payload, 9)).decode("ascii")
+
+def decode_raw_payload(raw_payload):
+    """
+    Converts a string from encode_raw_payload() back to the RSS entry as a dictionary
+    """
+    return json.loads(zlib.decompress(base64.b64decode(raw_payload)))
+
+def rss_attributes_method_with_projection(rss_attributes_method, projection, raw_payload=False, stats=None):
+    """
+    Generates an rss_attributes_method that appends projected fields of the entry to the row, so the fields that are
+    needed land in their own typed columns instead of a JSON string of the whole entry.
+
+    Parameters:
+        rss_attributes_method (method): A method that converts an RSS entry to a tuple of values to write.
+        projection (list<tuple>): A list of (column name, column type, path) or (column name, column type, path,
+            converter) tuples. The path is a dotted path into the entry, such as "enclosures.0.href". The converter
+            converts the value at the path to the column type, and defaults to str for dht.string columns. Missing
+            values, and values the converter fails on, are written as null.
+        raw_payload (bool): Whether to also append the whole entry, compressed with encode_raw_payload().
+        stats (dict): An optional dictionary that's updated with the number of "rows", and the "json_bytes" and
+            "projected_bytes" of a sample of "sampled_rows".
+
+    Returns:
+        method: A method that converts an RSS entry to a tuple of values followed by the projected values.
+    """
+    fields = []
+    for (column_name, column_type, path, *converter) in projection:
+        if converter:
+            converter = converter[0]
+        elif column_type is dht.string:
+            converter = str
+        else:
+            converter = None
+        fields.append((path, converter))
+
+    def a(entry):
+        row = tuple(rss_attributes_method(entry))
+        values = []
+        for (path, converter) in fields:
+            value = _entry_path(entry, path)
+            if value is not None and converter is not None:
+                try:
+                    value = converter(value)
+                except (TypeError, ValueError):
+                    value = None
+            values.append(value)
+        if raw_payload:
+            values.append(encode_raw_payload(entry))
+
+        if stats is not None:
+            with _projection_stats_lock:
+                stats["rows"] += 1
+                sample = stats["rows"] % _PROJECTION_SAMPLE_RATE == 1
+            #Serializing the entry costs as much as the projection saves, so only a sample of rows is measured
+            if sample:
+                json_bytes = len(json.dumps(entry, default=str).encode("utf-8"))
+                projected_bytes = sum(_value_size(value) for value in values)
+                with _projection_stats_lock:
+                    stats["sampled_rows"] += 1
+                    stats["json_bytes"] += json_bytes
+                    stats["projected_bytes"] += projected_bytes
+        return row + tuple(values)
+    return a
+
+def rss_projection_stats():
+    """
+    Reports how many bytes each projection used by read_rss_continual saves compared to storing the whole entry as JSON.
+
+    Returns:
+        dict: A dictionary of the tables' column names to a dictionary with the number of "rows" written, the average
+            "json_bytes_per_row" and "projected_bytes_per_row" of the sampled rows, and the "bytes_saved_per_row".
+    """
+    with _projection_stats_lock:
+        stats = {}
+        for (column_names, projection_stats) in _projection_stats.items():
+            sampled_rows = projection_stats["sampled_rows"] or 1
+            json_bytes_per_row = projection_stats["json_bytes"] / sampled_rows
+            projected_bytes_per_row = projection_stats["projected_bytes"] / sampled_rows
+            stats[column_names] = {
+                "rows": projection_stats["rows"],
+                "json_bytes_per_row": json_bytes_per_row,
+                "projected_bytes_per_row": projected_bytes_per_row,
+                "bytes_saved_per_row": json_bytes_per_row - projected_bytes_per_row
+            }
+        return stats
+
+def _new_feed_state(rss_feed_url):
+    """
+    Creates the polling state for a single RSS feed. The ETag and Last-Modified values from the previous
+    pull are sent back to the server so it can answer with a 304 if the feed hasn't changed, and the publish
+    times of recent entries are used to schedule the next pull.
+
+    The keys of the last seen_entry_limit entries are kept in least recently seen order so each entry is
+    written exactly once without the memory used growing forever.
+    """
+    return {
+        "url": rss_feed_url,
+        "subscribers": [],
+        "entries": [],
+        "seen_entries": OrderedDict(),
+        "seen_entry_limit": 0,
+        "publish_times": deque(maxlen=_PUBLISH_HISTORY_SIZE),
+        "interval": None,
+        "min_sleep_time": None,
+        "max_sleep_time": None,
+        "next_poll": time.time(),
+        "etag": None,
+        "modified": None,
+        "fetcher": None,
+        "streaming": False,
+        "feed_id": _feed_id(rss_feed_url),
+        "entry_key_salt": _entry_key_salt(rss_feed_url),
+        "parse_stats": {
+            "bytes_read": None,
+            "cpu_seconds": None,
+            "entries_parsed": None
+        },
+        "restored": False,
+        "stopped": False,
+        "possible_gaps": 0,
+        "polls": 0,
+        "not_modified": 0
+    }
+
+def _subscribe(rss_feed_url, subscriber, sleep_time, seen_entry_limit):
+    """
+    Subscribes a table writer to an RSS feed in the feed registry. The feed is only polled once no matter how
+    many tables subscribe to it, using the shortest poll bounds of its subscribers.
+
+    Returns:
+        dict: The feed state if this is a new feed that needs to be scheduled, otherwise None.
+    """
+    with _feed_registry_lock:
+        feed_state = _feed_registry.get(rss_feed_url)
+        is_new_feed = feed_state is None
+        if is_new_feed:
+            feed_state = _new_feed_state(rss_feed_url)
+            feed_state["interval"] = sleep_time
+            feed_state["min_sleep_time"] = subscriber["min_sleep_time"]
+            feed_state["max_sleep_time"] = subscriber["max_sleep_time"]
+            feed_state["fetcher"] = subscriber["fetcher"]
+            _feed_registry[rss_feed_url] = feed_state
+
+            feed_id = feed_state["feed_id"]
+            if _feed_id_urls.setdefault(feed_id, rss_feed_url) != rss_feed_url:
+                print(f"RSS feeds {_feed_id_urls[feed_id]} and {rss_feed_url} have the same FeedId {feed_id}")
+            _feed_ids_writer.logRow((feed_id, rss_feed_url))
+
+            feed_checkpoint = _reader_checkpoints.pop(rss_feed_url, None)
+            if feed_checkpoint is not None:
+                restore_feed_state(feed_state, feed_checkpoint)
+                feed_state["restored"] = True
+        else:
+            feed_state["interval"] = min(feed_state["interval"], sleep_time)
+            feed_state["min_sleep_time"] = min(feed_state["min_sleep_time"], subscriber["min_sleep_time"])
+            feed_state["max_sleep_time"] = min(feed_state["max_sleep_time"], subscriber["max_sleep_time"])
+
+        feed_state["streaming"] = feed_state["streaming"] or subscriber["streaming"]
+
+        #The feed keeps the fetcher of its first subscriber, so archive its payloads for any subscriber that asks
+        if subscriber["archive_payloads"] and not isinstance(feed_state["fetcher"], RecordingFetcher):
+            feed_state["fetcher"] = RecordingFetcher(feed_state["fetcher"], default_payload_archive)
+
+        #Late subscribers get the entries from the latest pull written on the next pull
+        subscriber["backfill_entries"] = feed_state["entries"]
+        feed_state["seen_entry_limit"] = max(feed_state["seen_entry_limit"], seen_entry_limit)
+        feed_state["subscribers"] = feed_state["subscribers"] + [subscriber]
+    return feed_state if is_new_feed else None
+
+def _fetch_feed(feed_state, poll_metrics):
+    """
+    Fetches an RSS feed using a conditional GET, and parses it with feedparser. The fetch and parse times, the HTTP
+    status, and the payload size are recorded in poll_metrics.
+
+    Returns:
+        FeedParserDict: The parsed feed, or None if the feed hasn't changed since the last pull.
+    """
+    fetch_start = time.perf_counter()
+    response = open_feed(feed_state)
+    feed_state["polls"] += 1
+    if response is None:
+        feed_state["not_modified"] += 1
+        poll_metrics.update(fetch_seconds=time.perf_counter() - fetch_start, http_status=304, payload_bytes=0)
+        return None
+
+    try:
+        body = response.read()
+    finally:
+        response.close()
+    poll_metrics.update(fetch_seconds=time.perf_counter() - fetch_start, http_status=response.status,
+                        payload_bytes=len(body))
+
+    parse_start = time.perf_counter()
+    feed = feedparser.parse(body, response_headers={
+        "content-location": response.geturl(),
+        "content-type": response.headers.get("Content-Type", "")
+    })
+    poll_metrics["parse_seconds"] = time.perf_counter() - parse_start
+    return feed
+
+def _stream_new_entries(feed_state, poll_metrics):
+    """
+    Pulls an RSS feed with the streaming parser in feed_streaming.py. Reading stops at the first entry that has
+    already been seen, so only the new entries at the top of the feed are downloaded and parsed. Feeds that aren't
+    well formed XML are parsed with feedparser instead.
+
+    Downloading and parsing are interleaved, so the fetch time in poll_metrics is the time until the response headers
+    arrive, and the parse time is the time spent reading and parsing the body.
+
+    Returns:
+        list: The entries read from the feed, newest first, or None if the feed hasn't changed since the last pull.
+    """
+    fetch_start = time.perf_counter()
+    response = open_feed(feed_state)
+    feed_state["polls"] += 1
+    if response is None:
+        feed_state["not_modified"] += 1
+        feed_state["parse_stats"]["bytes_read"] = 0
+        poll_metrics.update(fetch_seconds=time.perf_counter() - fetch_start, http_status=304, payload_bytes=0)
+        return None
+
+    base_url = response.geturl()
+    poll_metrics.update(fetch_seconds=time.perf_counter() - fetch_start, http_status=response.status)
+
+    parse_start = time.perf_counter()
+    recording_stream = _RecordingStream(response)
+    entries = []
+    try:
+        for entry in iter_feed_entries(recording_stream, base_url):
+            if _entry_key(entry) in feed_state["seen_entries"]:
+                break
+            entries.append(entry)
+    except ET.ParseError:
+        #Payloads recorded from streaming pulls end where the reader stopped, so replays stop at the end of the data
+        if not getattr(response, "truncated", False):
+            feed = feedparser.parse(recording_stream.read_all(), response_headers={"content-location": base_url})
+            entries = feed.entries
+    finally:
+        #Closing the response before the whole feed is read closes its connection instead of returning it to the pool
+        response.close()
+
+    feed_state["parse_stats"]["bytes_read"] = recording_stream.buffer.tell()
+    poll_metrics.update(parse_seconds=time.perf_counter() - parse_start, payload_bytes=recording_stream.buffer.tell())
+    return entries
+
+def _new_entries(feed_state, entries):
+    """
+    Finds the entries of a feed that haven't been seen before, and marks them as seen.
+
+    Entries are marked oldest first, so the newest keys are the last to be evicted. The seen entries are kept at
+    seen_entry_limit, or at the size of the pull if it's bigger, so the entries of one pull never push each other out.
+
+    Returns:
+        list: The new entries, newest first.
+    """
+    new_entries = []
+    seen_entries = feed_state["seen_entries"]
+    for entry in reversed(entries):
+        entry_key = _entry_key(entry)
+
+        #Skip entries that have already been written, and keep recently seen entries from being evicted
+        if entry_key in seen_entries:
+            seen_entries.move_to_end(entry_key)
+            continue
+
+        #Entries that fail are marked as seen too so they aren't retried on every pull
+        seen_entries[entry_key] = None
+        new_entries.append(entry)
+
+    #A while loop also trims a restored checkpoint that's bigger than the limit
+    seen_entry_limit = max(feed_state["seen_entry_limit"], len(entries))
+    while len(seen_entries) > seen_entry_limit:
+        seen_entries.popitem(last=False)
+    new_entries.reverse()
+    return new_entries
+
+def _entries_to_rows(feed_state, entries, subscriber):
+    """
+    Converts RSS entries to rows for a subscriber. If the subscriber's rss_attributes_method has a batch method, like
+    the methods from rss_attributes_method_with_scores() with a score_method_batch, every entry is converted at once.
+
+    Returns:
+        (list, list): The rows to write to the subscriber's table, and the publish times in seconds since the epoch
+            of those rows.
+    """
+    rss_attributes_method = subscriber["rss_attributes_method"]
+    dated_entries = []
+    for entry in entries:
+        try:
+            datetime_attribute = subscriber["rss_datetime_converter"](entry)
+
+            #If no datetime, skip the entry
+            if datetime_attribute is not None:
+                dated_entries.append((entry, _datetime_to_seconds(datetime_attribute)))
+        except Exception as e:
+            #Swallow exceptions for now if things go wrong, the RSS feeds aren't 100% the same format
+            print(f"Error on reading RSS feed {feed_state['url']}")
+            print(e)
+
+    #If the batch fails, the entries are converted one at a time so only the bad ones are skipped
+    batch_rows = None
+    if dated_entries and hasattr(rss_attributes_method, "batch"):
+        try:
+            batch_rows = rss_attributes_method.batch([entry for (entry, _) in dated_entries])
+        except Exception as e:
+            print(f"Error on reading RSS feed {feed_state['url']}, converting its entries one at a time")
+            print(e)
+
+    rows = []
+    publish_times = []
+    for (i, (entry, publish_time)) in enumerate(dated_entries):
+        try:
+            row = batch_rows[i] if batch_rows is not None else rss_attributes_method(entry)
+            if subscriber["entry_keys"]:
+                row = tuple(row) + (_entry_key(entry) ^ feed_state["entry_key_salt"], feed_state["feed_id"])
+            rows.append(row)
+            publish_times.append(publish_time)
+        except Exception as e:
+            #Swallow exceptions for now if things go wrong, the RSS feeds aren't 100% the same format
+            print(f"Error on reading RSS feed {feed_state['url']}")
+            print(e)
+    return (rows, publish_times)
+
+def _poll_feed(feed_state, poll_metrics):
+    """
+    Pulls an RSS feed once and converts every entry that hasn't been seen before into a row for each
+    subscriber of the feed. The fetch, parse, and scoring times of the pull are recorded in poll_metrics.
+
+    Returns:
+        (list, list): A list of (subscriber, rows) tuples, with the rows newest first, and the publish times in seconds
+            since the epoch of the new entries.
+    """
+    cpu_start = time.thread_time()
+    _scoring_timer.seconds = 0.0
+
+    if feed_state["streaming"]:
+        entries = _stream_new_entries(feed_state, poll_metrics)
+    else:
+        feed = _fetch_feed(feed_state, poll_metrics)
+        entries = None if feed is None else feed.entries
+
+    #CPU time is per thread, so this doesn't include time spent waiting on the network or on other feeds
+    parse_stats = feed_state["parse_stats"]
+    parse_stats["cpu_seconds"] = time.thread_time() - cpu_start
+    parse_stats["entries_parsed"] = 0 if entries is None else len(entries)
+
+    #Subscribers that join after this point get these entries through their backfill instead
+    with _feed_registry_lock:
+        new_entries = []
+        if entries is not None:
+            new_entries = _new_entries(feed_state, entries)
+
+            #If nothing in the first pull after a restart was seen before, entries may have scrolled off the feed
+            #while the reader was down. The streaming parser stops at seen entries, so this can't be told for it.
+            if feed_state["restored"] and not feed_state["streaming"] and entries and len(new_entries) == len(entries):
+                feed_state["possible_gaps"] += 1
+                print(f"RSS feed {feed_state['url']} may have missed entries while the reader was down")
+            feed_state["restored"] = False
+
+            #The streaming parser stops at the first old entry, so keep the newest entries across pulls for backfills
+            if feed_state["streaming"]:
+                feed_state["entries"] = (new_entries + feed_state["entries"])[:_STREAMING_BACKFILL_SIZE]
+            else:
+                feed_state["entries"] = entries
+
+        pulled = entries is not None
+        subscriber_entries = []
+        for subscriber in feed_state["subscribers"]:
+            entries = new_entries
+            if subscriber["backfill_entries"]:
+                entries = new_entries + subscriber["backfill_entries"]
+            subscriber["backfill_entries"] = None
+
+            #Entries that read_rss_backfill() already wrote to this table are only new on the first pull after it
+            written_by_backfill = subscriber["written_by_backfill"]
+            if written_by_backfill and pulled:
+                entries = [entry for entry in entries if _entry_key(entry) not in written_by_backfill]
+                subscriber["written_by_backfill"] = None
+            subscriber_entries.append((subscriber, entries))
+
+    subscriber_rows = []
+    publish_times = None
+    for (subscriber, entries) in subscriber_entries:
+        (rows, subscriber_publish_times) = _entries_to_rows(feed_state, entries, subscriber)
+        subscriber_rows.append((subscriber, rows))
+
+        #Every subscriber sees the same new entries, so the publish times only need to be kept once
+        if publish_times is None and entries is new_entries:
+            publish_times = subscriber_publish_times
+
+    poll_metrics["new_entries"] = len(new_entries)
+    poll_metrics["scoring_seconds"] = _scoring_timer.seconds
+    return (subscriber_rows, publish_times or [])
+
+def _datetime_to_seconds(datetime_attribute):
+    """
+    Converts a Deephaven datetime object to seconds since the epoch.
+    """
+    return datetime_attribute.getNanos() / 1e9
+
+def _estimate_publish_interval(feed_state):
+    """
+    Estimates the average number of seconds between entries of a feed from the publish times of the entries
+    written so far.
+
+    Returns:
+        float: The estimated number of seconds between entries, or None if there isn't enough history.
+    """
+    publish_times = sorted(feed_state["publish_times"])
+    if len(publish_times) < 2:
+        return None
+    return (publish_times[-1] - publish_times[0]) / (len(publish_times) - 1)
+
+def _schedule_next_poll(feed_state, updated, failed, retry_after=None):
+    """
+    Sets the next poll time of a feed based on how often it publishes.
+
+    Feeds are polled about twice per expected entry, so busy feeds are polled often and quiet feeds are polled
+    less and less until the feed's max_sleep_time is reached. Failed pulls back off exponentially, except when the
+    host asked to be retried after retry_after seconds, in which case the feed is polled again right after that.
+    """
+    interval = feed_state["interval"]
+    estimate = _estimate_publish_interval(feed_state)
+
+    if retry_after is not None:
+        feed_state["next_poll"] = time.time() + max(retry_after, feed_state["min_sleep_time"])
+        return
+
+    if failed:
+        interval = interval * 2
+    elif updated:
+        interval = feed_state["min_sleep_time"] if estimate is None else estimate / 2
+    else:
+        interval = max(interval * 1.5, 0 if estimate is None else estimate / 2)
+
+    feed_state["interval"] = min(max(interval, feed_state["min_sleep_time"]), feed_state["max_sleep_time"])
+    feed_state["next_poll"] = time.time() + feed_state["interval"]
+
+def _new_poll_metrics():
+    """
+    Creates the metrics of a single pull of a feed, written to the rss_poll_metrics table when the pull finishes
+    """
+    return {
+        "fetch_seconds": None,
+        "http_status": None,
+        "payload_bytes": None,
+        "parse_seconds": None,
+        "new_entries": 0,
+        "error_class": None,
+        "scoring_seconds": 0.0
+    }
+
+async def _poll_and_write(feed_state, executor):
+    """
+    Polls a feed on the executor, and writes the new rows to the subscribers' tables from the event loop so only
+    one thread ever writes to a table writer. Each table's rows from the pull are written in a single flush. A row of
+    metrics about the pull is written to the rss_poll_metrics table.
+    """
+    loop = asyncio.get_event_loop()
+    updated = False
+    failed = False
+    retry_after = None
+    poll_metrics = _new_poll_metrics()
+    publish_lag = None
+    try:
+        (subscriber_rows, publish_times) = await loop.run_in_executor(executor, _poll_feed, feed_state, poll_metrics)
+        for (subscriber, rows) in subscriber_rows:
+            subscriber["table_writer"].append_rows(rows)
+        for (subscriber, rows) in subscriber_rows:
+            subscriber["table_writer"].flush()
+        feed_state["publish_times"].extend(publish_times)
+        updated = len(publish_times) > 0
+        if updated:
+            publish_lag = time.time() - max(publish_times)
+    except Exception as e:
+        failed = True
+        poll_metrics["error_class"] = type(e).__name__
+        if isinstance(e, HttpStatusError):
+            poll_metrics["http_status"] = e.code
+        if isinstance(e, RetryAfterError):
+            retry_after = e.retry_after
+        print(f"Error on reading RSS feed {feed_state['url']}")
+        print(e)
+    finally:
+        #Free the poll's slot and keep the feed scheduled even if the poll was cancelled or writing its metrics fails
+        _rss_engine["in_flight"] -= 1
+        try:
+            _poll_metrics_writer.logRow(currentTime(), feed_state["url"], poll_metrics["fetch_seconds"],
+                                        poll_metrics["http_status"], poll_metrics["payload_bytes"],
+                                        poll_metrics["parse_seconds"], poll_metrics["new_entries"],
+                                        poll_metrics["error_class"], poll_metrics["scoring_seconds"], publish_lag)
+        except Exception as e:
+            print(f"Unable to write the poll metrics of RSS feed {feed_state['url']}")
+            print(e)
+        _schedule_next_poll(feed_state, updated, failed, retry_after)
+        _schedule_feed(feed_state)
+
+def _schedule_feed(feed_state):
+    """
+    Adds a feed to the engine's priority queue, unless it was stopped. This must be called from the engine's event loop.
+    """
+    if feed_state["stopped"]:
+        return
+    heapq.heappush(_rss_engine["schedule"], (feed_state["next_poll"], id(feed_state), feed_state))
+    _rss_engine["wakeup"].set()
+
+def _checkpoint_feed_states():
+    """
+    Converts the state of every feed in the feed registry to checkpoints. This must be called from the engine's event
+    loop, since the event loop updates the schedules.
+    """
+    with _feed_registry_lock:
+        return {url: checkpoint_feed_state(feed_state) for (url, feed_state) in _feed_registry.items()}
+
+async def _checkpoint_periodically(executor):
+    """
+    Checkpoints the state of every feed every CHECKPOINT_INTERVAL seconds. The file is written on the executor so the
+    event loop isn't blocked.
+    """
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(CHECKPOINT_INTERVAL)
+        try:
+            await loop.run_in_executor(executor, write_checkpoint, CHECKPOINT_PATH, _checkpoint_feed_states())
+        except Exception as e:
+            print(f"Unable to write the reader checkpoint {CHECKPOINT_PATH}")
+            print(e)
+
+def _run_rss_engine(ready):
+    """
+    Runs the asyncio ingestion engine shared by every read_rss_continual call.
+
+    Feeds are kept in a priority queue ordered by their next poll time. Due feeds are fetched on a thread pool, with at
+    most the engine's concurrency limit being fetched at once, so a slow host only holds up its own feed instead of every
+    feed behind it.
+    """
+    async def main():
+        _rss_engine["loop"] = asyncio.get_event_loop()
+        _rss_engine["wakeup"] = asyncio.Event()
+        ready.set()
+
+        schedule = _rss_engine["schedule"]
+        polls = set()
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENCY, thread_name_prefix="rss-reader") as executor:
+            if CHECKPOINT_PATH:
+                asyncio.ensure_future(_checkpoint_periodically(executor))
+
+            while True:
+                now = time.time()
+                while schedule and schedule[0][0] <= now and _rss_engine["in_flight"] < _rss_engine["concurrency"]:
+                    (_, _, feed_state) = heapq.heappop(schedule)
+                    if feed_state["stopped"]:
+                        continue
+                    _rss_engine["in_flight"] += 1
+                    task = asyncio.ensure_future(_poll_and_write(feed_state, executor))
+                    polls.add(task)
+                    task.add_done_callback(polls.discard)
+
+                #Sleep until the next feed is due, or until a poll finishes or a feed is added
+                wakeup = _rss_engine["wakeup"]
+                wakeup.clear()
+                timeout = None
+                if schedule and _rss_engine["in_flight"] < _rss_engine["concurrency"]:
+                    timeout = max(schedule[0][0] - now, 0)
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    asyncio.run(main())
+
+def _start_feeds(feed_states, concurrency):
+    """
+    Starts the shared ingestion engine if it isn't running yet, raises its concurrency limit to at least the given
+    value, and schedules the given feeds.
+    """
+    with _feed_registry_lock:
+        if _rss_engine["thread"] is None:
+            ready = threading.Event()
+            _rss_engine["thread"] = threading.Thread(target=_run_rss_engine, args=[ready], name="rss-engine")
+            _rss_engine["thread"].start()
+            ready.wait()
+
+    def start():
+        _rss_engine["concurrency"] = max(_rss_engine["concurrency"], min(concurrency, _MAX_CONCURRENCY))
+        for feed_state in feed_states:
+            _schedule_feed(feed_state)
+        _rss_engine["wakeup"].set()
+
+    _rss_engine["loop"].call_soon_threadsafe(start)
+
+def stop_rss_feeds(rss_feed_urls):
+    """
+    Stops polling RSS feeds for every table that reads them, and removes them from the feed registry, so they aren't
+    checkpointed or reported by rss_poll_stats() anymore. The rows already written stay in the tables. A pull that's
+    in progress still writes its rows. Reading a stopped feed with read_rss_continual starts it again from scratch.
+
+    Parameters:
+        rss_feed_urls (list<str>): The RSS feed URLs to stop.
+
+    Returns:
+        int: The number of feeds that were stopped.
+    """
+    stopped = 0
+    with _feed_registry_lock:
+        for rss_feed_url in dict.fromkeys(rss_feed_urls):
+            feed_state = _feed_registry.pop(rss_feed_url, None)
+            if feed_state is not None:
+                feed_state["stopped"] = True
+                stopped += 1
+    return stopped
+
+def _seen_entries_size(seen_entries):
+    """
+    Approximates the number of bytes used by a feed's seen entry keys.
+    """
+    return sys.getsizeof(seen_entries) + sum(sys.getsizeof(entry_key) for entry_key in list(seen_entries))
+
+def rss_poll_stats():
+    """
+    Reports how many times each RSS feed has been polled by read_rss_continual, how many of those polls
+    were short-circuited by the server answering a conditional GET with a 304, and how many entry keys are
+    being remembered to skip entries that have already been written.
+
+    Returns:
+        dict: A dictionary of RSS feed URL to a dictionary with the "subscribers", "polls", "not_modified",
+            "seen_entries", "seen_entries_bytes", and "possible_gaps" since a restart values, and the "last_parse"
+            stats of the latest pull. The "last_parse" stats are the "bytes_read" (streamed feeds only), the
+            "cpu_seconds" spent fetching and parsing, and the "entries_parsed".
+    """
+    with _feed_registry_lock:
+        feed_states = list(_feed_registry.values())
+
+    stats = {}
+    for feed_state in feed_states:
+        stats[feed_state["url"]] = {
+            "subscribers": len(feed_state["subscribers"]),
+            "polls": feed_state["polls"],
+            "not_modified": feed_state["not_modified"],
+            "seen_entries": len(feed_state["seen_entries"]),
+            "seen_entries_bytes": _seen_entries_size(feed_state["seen_entries"]),
+            "possible_gaps": feed_state["possible_gaps"],
+            "last_parse": dict(feed_state["parse_stats"])
+        }
+    return stats
+
 def read_single_rss_entry(rss_feed_url):
     """
     This method returns a single entry from the given RSS feed. This is mostly used
@@ -38,9 +868,10 @@ def read_single_rss_entry(rss_feed_url):
     return feedparser.parse(rss_feed_url).entries[0]
 
 
-def read_rss_static(rss_feed_url=None, rss_attributes_method=None, rss_datetime_converter=None):
+def read_rss_static(rss_feed_url=None, rss_attributes_method=None, rss_datetime_converter=None, fetcher=None):
     """
-    This methods reads from an RSS feed once and stores its data
+    This methods reads from an RSS feed once and stores its data. To load the history of many feeds at once, use
+    read_rss_backfill() instead.
     
     Parameters:
         rss_feed_url (str): The RSS feed URL as a string.
@@ -48,6 +879,7 @@ def read_rss_static(rss_feed_url=None, rss_attributes_method=None, rss_datetime_
             customized based on the RSS feed.
         rss_datetime_converter (method): A method that takes an RSS feed entry and converts it to a Deephaven datetime object.
             This should be customized based on the RSS feed.
+        fetcher (PooledHttpFetcher): The fetcher used to download the feed. Defaults to default_fetcher.
 
     Returns:
         Table: The Deephaven table that will contain the results from the RSS feed.
@@ -57,7 +889,20 @@ def read_rss_static(rss_feed_url=None, rss_attributes_method=None, rss_datetime_
     if rss_datetime_converter is None:
         rss_datetime_converter = _default_rss_datetime_converter
 
-    feed = feedparser.parse(rss_feed_url)
+    if fetcher is None:
+        fetcher = default_fetcher
+
+    #Like feedparser, a feed that can't be fetched gives an empty table instead of failing
+    try:
+        (body, response) = fetcher.fetch_bytes(rss_feed_url)
+        entries = feedparser.parse(body, response_headers={
+            "content-location": response.geturl(),
+            "content-type": response.headers.get("Content-Type", "")
+        }).entries
+    except Exception as e:
+        print(f"Error on reading RSS feed {rss_feed_url}")
+        print(e)
+        entries = []
 
     column_names = [
         "Sentence",
@@ -67,40 +912,133 @@ def read_rss_static(rss_feed_url=None, rss_attributes_method=None, rss_datetime_
         dht.string,
         dht.datetime
     ]
-    table_writer = DynamicTableWriter(column_names, column_types)
+    table_writer = BufferedTableWriter(column_names, column_types)
 
-    i = 0
-    while i < len(feed.entries):
-        entry = feed.entries[i]
+    #Every attribute is written as its own row, so collect them all and write them in one flush
+    rows = []
+    for entry in entries:
         datetime_attribute = rss_datetime_converter(entry)
+        rows.extend((attribute, datetime_attribute) for attribute in rss_attributes_method(entry))
+    table_writer.append_rows(rows)
+    table_writer.flush()
 
-        for attribute in rss_attributes_method(entry):
-            table_writer.logRow(
-                attribute,
-                datetime_attribute
-            )
+    return table_writer.getTable()
 
-        i += 1
+def _new_subscriber(rss_attributes_method, rss_datetime_converter, column_names, column_types, streaming, projection,
+        raw_payload, entry_keys, table_writer, retention_seconds, retention_name):
+    """
+    Builds the columns, rss_attributes_method, and table writer of a table that reads feeds. See read_rss_continual()
+    for the parameters.
 
-    return table_writer.getTable()
+    Returns:
+        dict: The subscriber to copy for each feed the table reads, which holds the table writer.
+    """
+    if column_names is None:
+        column_names = [
+            "RssEntryTitle",
+            "PublishDatetime",
+            "RssFeedUrl"
+        ]
+    if column_types is None:
+        column_types = [
+            dht.string,
+            dht.datetime,
+            dht.string
+        ]
+
+    if rss_attributes_method is None:
+        rss_attributes_method = _default_rss_attributes_method
+    if rss_datetime_converter is None:
+        rss_datetime_converter = _default_rss_datetime_converter
+
+    if projection is not None:
+        column_names = list(column_names) + [field[0] for field in projection]
+        column_types = list(column_types) + [field[1] for field in projection]
+        if raw_payload:
+            column_names.append("RawPayload")
+            column_types.append(dht.string)
+
+        #Tables with the same columns share their stats
+        with _projection_stats_lock:
+            projection_stats = _projection_stats.setdefault(", ".join(column_names),
+                {"rows": 0, "sampled_rows": 0, "json_bytes": 0, "projected_bytes": 0})
+        rss_attributes_method = rss_attributes_method_with_projection(rss_attributes_method, projection,
+                                                                      raw_payload=raw_payload, stats=projection_stats)
+
+    if entry_keys:
+        column_names = list(column_names) + ["EntryKey", "FeedId"]
+        column_types = list(column_types) + [dht.int64, dht.int32]
+
+    if retention_seconds is not None:
+        if table_writer is not None:
+            raise ValueError("retention_seconds can't be used with table_writer, use a RetainedTableWriter instead")
+        if retention_name is None:
+            raise ValueError("retention_name is required with retention_seconds")
+        table_writer = RetainedTableWriter(column_names, column_types, retention_name, retention_seconds)
+    if table_writer is None:
+        table_writer = BufferedTableWriter(column_names, column_types)
+
+    return {
+        "table_writer": table_writer,
+        "rss_attributes_method": rss_attributes_method,
+        "rss_datetime_converter": rss_datetime_converter,
+        "streaming": streaming,
+        "entry_keys": entry_keys,
+        "written_by_backfill": None
+    }
 
 def read_rss_continual(rss_feed_urls, rss_attributes_method=None, rss_datetime_converter=None,
-        sleep_time=5, column_names=None, column_types=None, thread_count=None):
+        sleep_time=5, column_names=None, column_types=None, thread_count=None, concurrency=None,
+        min_sleep_time=None, max_sleep_time=None, seen_entry_limit=_DEFAULT_SEEN_ENTRY_LIMIT, streaming=False,
+        projection=None, raw_payload=False, table_writer=None, fetcher=None, retention_seconds=None,
+        retention_name=None, entry_keys=False, archive_payloads=False):
     """
     This method continually reads from an RSS feed and stores its data in a Deephaven table.
 
-    Data is only written to the Deephaven table if it's new data. This is determined by the timestamp of the entries.
+    Data is only written to the Deephaven table if it's new data. This is determined by the id (the RSS guid) of the
+    entries, falling back to the link and then the title, so entries that share a timestamp are all written exactly once.
+    Feeds are pulled with a conditional GET (ETag/Last-Modified), so feeds that haven't changed aren't downloaded
+    or parsed again. Use rss_poll_stats() to see how many pulls were skipped this way. Use stop_rss_feeds() to stop
+    reading feeds.
+
+    The seen entries, ETags, and schedule of every feed are checkpointed to the /data volume, and restored when the feed
+    is read again after a restart, so entries that were already written aren't written again. See reader_checkpoint.py.
+
+    Every pull of every feed writes a row to the rss_poll_metrics table with the fetch and parse times, the HTTP status,
+    the payload size, the number of new entries, the class of any error, the time spent scoring the entries with
+    rss_attributes_method_with_scores(), and how long after it was published the newest new entry was written.
+
+    Tables can set entry_keys to add an EntryKey long column, a hash of the entry's id (or link, or title) and its feed,
+    and a FeedId int column, a hash of the feed URL. Joins, dedup, and per-feed aggregations on these run on primitive
+    values instead of strings. The rss_feed_ids table maps every FeedId back to its URL.
 
-    This method works best with RSS feeds that are always ordered by date-time, and update frequently. Some
-    examples of this are Reddit and Hackernews RSS feeds. If you're unsure if your RSS feed will work, you can
-    play it safe and use the read_rss_static() method and build your own method.
+    Tables can set archive_payloads to keep every payload fetched from their feeds in a compressed archive on the
+    /data volume. replay_rss_archive() feeds the archive back through the same parse, convert, score, and write steps,
+    so new classifiers and attributes methods can be tried on old data. See payload_archive.py.
+
+    Tables that read busy feeds for a long time can set retention_seconds, so the table only shows that many seconds
+    of entries, and older rows are rolled off to Parquet files on the /data volume. Use read_rss_history() to read the
+    rolled off rows and the table together. See table_retention.py.
+
+    This method works best with RSS feeds that update frequently. Some examples of this are Reddit and Hackernews
+    RSS feeds. If you're unsure if your RSS feed will work, you can play it safe and use the read_rss_static() method
+    and build your own method.
 
     This method is highly customizeable. rss_attributes_method, column_names, and column_types define the resulting
     Deephaven table, and rss_datetime_converter allows you to define how the datetime of the entry is computed. sleep_time
     can be customized for performance (a larger value is useful for feeds that don't update often, while a smaller value
     is better for feeds that update quickly).
 
-    thread_count can be used to run the RSS reader across multiple threads.
+    Each feed is polled on its own schedule. The time between pulls starts at sleep_time and adapts to how often the feed
+    publishes, staying between min_sleep_time and max_sleep_time. Feeds that fail to pull back off up to max_sleep_time.
+
+    Feeds are fetched by an asyncio engine running in a single background thread. concurrency limits how many feeds
+    are fetched at once, so a slow feed doesn't hold up the others and thousands of feeds don't need thousands of threads.
+    The engine is shared by every call, and its limit is the largest concurrency any call has asked for.
+
+    Every feed URL is only polled once, even if it's passed to read_rss_continual several times. New entries are written
+    to every table that reads from the feed, each with its own rss_attributes_method and columns. A feed shared by several
+    tables uses the shortest sleep times of those tables.
 
     Parameters:
         rss_feed_urls (list<str>): A list of RSS feed URLs to view.
@@ -108,95 +1046,63 @@ def read_rss_continual(rss_feed_urls, rss_attributes_method=None, rss_datetime_c
         rss_datetime_converter (method): A method that takes an RSS feed entry and converts it to a Deephaven datetime object.
             This should be customized based on the RSS feed.
         sleep_time (int): An integer representing the number of seconds to wait between
-            RSS pulls if data hasn't changed.
+            RSS pulls before the publish rate of the feed is known.
         column_names (list<str>): A list of column names for the resulting table.
         column_types (list<dht.type>): A list of column types for the resulting table.
-        thread_count (int): How many threads to run the RSS reader in. If not set, 1 thread will be used.
+        thread_count (int): Kept for compatibility. If concurrency isn't set, this is used as the concurrency limit.
+        concurrency (int): The maximum number of feeds to fetch at once. If not set, thread_count is used, and if
+            that isn't set either, 8 feeds are fetched at once.
+        min_sleep_time (int): The minimum number of seconds between pulls of a feed. If not set, sleep_time is used.
+        max_sleep_time (int): The maximum number of seconds between pulls of a feed. If not set, sleep_time is used.
+        seen_entry_limit (int): How many entry keys to remember per feed. This should be larger than the number of
+            entries the feed returns on a single pull.
+        streaming (bool): Whether to parse the feeds incrementally, and stop reading each feed at the first entry
+            that has already been seen. This is much cheaper for large feeds that list their newest entries first,
+            like podcasts. Entries only have the fields feed_streaming.py extracts. Defaults to False.
+        projection (list<tuple>): A list of (column name, column type, path[, converter]) tuples naming fields of the
+            entries to write to their own typed columns after the columns of rss_attributes_method. See
+            rss_attributes_method_with_projection() for the format. Use rss_projection_stats() to see how many
+            bytes this saves compared to storing the whole entry as JSON.
+        raw_payload (bool): Whether to also write the whole entry, compressed, to a RawPayload string column. Only
+            used with projection. Use decode_raw_payload() to read it. Defaults to False.
+        table_writer (BufferedTableWriter): A writer to write the rows to instead of a new table, so several calls can
+            share one table. The writer must have the columns the rows are written with.
+        fetcher (PooledHttpFetcher): The fetcher used to download the feeds. Defaults to default_fetcher, which keeps
+            connections alive and limits the rate of requests to each host. A feed shared by several tables uses the
+            fetcher of the first table that reads it.
+        retention_seconds (float): How many seconds of entries, by PublishDatetime, the table shows. Older rows are
+            rolled off to the archive. Defaults to keeping every row in the table.
+        retention_name (str): The name of the table in the archive. Required with retention_seconds.
+        entry_keys (bool): Whether to add the EntryKey and FeedId columns after every other column. Defaults to False.
+        archive_payloads (bool): Whether to append every payload fetched for these feeds to the payload archive on the
+            /data volume, so it can be replayed later with replay_rss_archive(). Feeds that other tables already read
+            are archived too. Defaults to False.
 
     Returns:
         Table: The Deephaven table that will contain the results from the RSS feed.
     """
-    def thread_function(rss_feed_urls, rss_attributes_method, rss_datetime_converter, sleep_time, table_writer):
-        last_updated_list = [None for i in range(len(rss_feed_urls))]
-
-        while True:
-            rss_feed_url_index = 0
-            updated = False
-            while rss_feed_url_index < len(rss_feed_urls):
-                rss_feed_url = rss_feed_urls[rss_feed_url_index]
-                last_updated = last_updated_list[rss_feed_url_index]
-                feed = feedparser.parse(rss_feed_url)
-
-                i = 0
-                while i < len(feed.entries):
-                    try:
-                        entry = feed.entries[i]
-                        datetime_attribute = rss_datetime_converter(entry)
-
-                        #If no datetime, break
-                        if datetime_attribute is None:
-                            break
-
-                        #If data has previously been read, and the current item has a timestamp less than or equal
-                        #to the last item written to the table in the previous pull, then stop writing data.
-                        #RSS feeds can unpublish data, so a strict equality comparison can't work.
-                        #This may result in lost data if the RSS feed can publish multiple items with the same timestamp.
-                        if not (last_updated is None) and datetime_attribute <= last_updated:
-                            break
-
-                        write_row = rss_attributes_method(entry)
-                        table_writer.logRow(
-                            write_row
-                        )
-                    except Exception as e:
-                        #Swallow exceptions for now if things go wrong, the RSS feeds aren't 100% the same format
-                        print(f"Error on reading RSS feed {rss_feed_url}")
-                        print(e)
-
-                    i += 1
-
-                if not i == 0: #If feed has been updated, set last updated time to the newest item in the feed
-                    updated = True
-                    last_updated_list[rss_feed_url_index] = rss_datetime_converter(feed.entries[0])
-
-                rss_feed_url_index += 1
-            #Sleep after going through the entire list if no feeds were updated
-            if not updated:
-                time.sleep(sleep_time)
+    if concurrency is None:
+        concurrency = _DEFAULT_CONCURRENCY if thread_count is None else thread_count
 
-    if column_names is None:
-        column_names = [
-            "RssEntryTitle",
-            "PublishDatetime",
-            "RssFeedUrl"
-        ]
-    if column_types is None:
-        column_types = [
-            dht.string,
-            dht.datetime,
-            dht.string
-        ]
+    if min_sleep_time is None:
+        min_sleep_time = sleep_time
+    if max_sleep_time is None:
+        max_sleep_time = sleep_time
 
-    if rss_attributes_method is None:
-        rss_attributes_method = _default_rss_attributes_method
-    if rss_datetime_converter is None:
-        rss_datetime_converter = _default_rss_datetime_converter
+    if fetcher is None:
+        fetcher = default_fetcher
 
-    if thread_count is None:
-        table_writer = DynamicTableWriter(column_names, column_types)
-        thread = threading.Thread(target=thread_function, args=[rss_feed_urls, rss_attributes_method, rss_datetime_converter, sleep_time, table_writer])
-        thread.start()
-        return table_writer.getTable()
-    else:
-        tables = []
-        thread_index = 0
-        urls_per_thread = math.ceil(len(rss_feed_urls)/thread_count)
-        while thread_index < thread_count:
-            table_writer = DynamicTableWriter(column_names, column_types)
-            start_index = thread_index * urls_per_thread
-            #Apparently Python doesn't check index bounds on list splices [:], so this just straight up works
-            thread = threading.Thread(target=thread_function, args=[rss_feed_urls[start_index:start_index + urls_per_thread], rss_attributes_method, rss_datetime_converter, sleep_time, table_writer])
-            thread.start()
-            thread_index += 1
-            tables.append(table_writer.getTable())
-        return merge(tables) 
+    subscriber_template = _new_subscriber(rss_attributes_method, rss_datetime_converter, column_names, column_types,
+                                          streaming, projection, raw_payload, entry_keys, table_writer,
+                                          retention_seconds, retention_name)
+    subscriber_template.update(min_sleep_time=min_sleep_time, max_sleep_time=max_sleep_time, fetcher=fetcher,
+                               archive_payloads=archive_payloads)
+
+    feed_states = []
+    for rss_feed_url in dict.fromkeys(rss_feed_urls):
+        feed_state = _subscribe(rss_feed_url, dict(subscriber_template), sleep_time, seen_entry_limit)
+        if feed_state is not None:
+            feed_states.append(feed_state)
+
+    _start_feeds(feed_states, concurrency)
+    return subscriber_template["table_writer"].getTable()
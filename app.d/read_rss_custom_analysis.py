@@ -27,8 +27,6 @@ def build_model():
     """
     Builds the NaiveBayesClassifier model
     """
-    nltk.download('movie_reviews')
-
     negids = movie_reviews.fileids('neg')
     posids = movie_reviews.fileids('pos')
 
@@ -39,33 +37,50 @@ def build_model():
 
     return NaiveBayesClassifier.train(trainfeats)
 
-def build_model_func(classifier):
+def build_model_func(classifier, model_id="naive_bayes_movie_reviews"):
     """
-    Generates a method that classifies a string using the given classifier
+    Generates a method that classifies a string using the given classifier. Classifications are cached
+    in the shared score cache under the given model ID.
     """
     def a(strn):
         return classifier.classify(_word_feats_string(strn))
-    return a
+    return cache_scores(model_id, a)
 
-classifier = build_model_func(build_model())
+def build_numpy_model():
+    """
+    Exports the NaiveBayesClassifier model to NumPy arrays
+    """
+    return export_naive_bayes(naive_bayes_model.get())
+
+#The models are built once and saved in the model store, and only loaded when the first title is classified.
+#The NLTK model is only trained if the store doesn't have the exported NumPy model yet, so the NumPy model's version
+#includes the code the NLTK model is trained with, and changing that code rebuilds both.
+naive_bayes_model = LazyModel("naive_bayes_movie_reviews", build_model, nltk_resources={"movie_reviews": "corpora/movie_reviews"})
+numpy_naive_bayes_model = LazyModel("naive_bayes_movie_reviews_numpy", build_numpy_model,
+                                    nltk_resources={"movie_reviews": "corpora/movie_reviews"},
+                                    version=f"{NUMPY_MODEL_VERSION}-{_code_version(build_model)}-{_code_version(_word_feats)}")
+#Batches are scored in worker processes if RSS_SCORING_POOL_PROCESSES is set, otherwise in process. Titles already in
+#the shared score cache aren't sent to the pool.
+naive_bayes_scoring_pool = ScoringPool("naive_bayes_numpy", numpy_naive_bayes_model, build_numpy_model_batch_func(numpy_naive_bayes_model))
+classifier_batch = cache_scores_batch("naive_bayes_movie_reviews", naive_bayes_scoring_pool.score)
 
 #Continual readers
 rss_feed_urls = ["https://www.reddit.com/r/wallstreetbets/new/.rss"]
-custom_sia_wsb = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit)
+custom_sia_wsb = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, min_sleep_time=2, max_sleep_time=60, entry_keys=True)
 
 rss_feed_urls = ["https://www.reddit.com/r/all/new/.rss"]
-custom_sia_all = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, sleep_time=1)
+custom_sia_all = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, sleep_time=1, max_sleep_time=30, entry_keys=True)
 
 rss_feed_urls = ["https://hnrss.org/newest"]
-custom_sia_hackernews = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_hackernews, rss_datetime_converter=datetime_converter_hackernews, sleep_time=60)
+custom_sia_hackernews = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_hackernews, rss_datetime_converter=datetime_converter_hackernews, sleep_time=60, min_sleep_time=15, max_sleep_time=600, entry_keys=True)
 
 rss_feed_urls = ["https://seekingalpha.com/feed.xml"]
-custom_sia_seeking_alpha = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_seeking_alpha, rss_datetime_converter=datetime_converter_seeking_alpha, sleep_time=120)
+custom_sia_seeking_alpha = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_seeking_alpha, rss_datetime_converter=datetime_converter_seeking_alpha, sleep_time=120, min_sleep_time=30, max_sleep_time=900, entry_keys=True)
 
-custom_sia_wsb = custom_sia_wsb.update("Sentiment = classifier(RssEntryTitle)")
-custom_sia_all = custom_sia_all.update("Sentiment = classifier(RssEntryTitle)")
-custom_sia_hackernews = custom_sia_hackernews.update("Sentiment = classifier(RssEntryTitle)")
-custom_sia_seeking_alpha = custom_sia_seeking_alpha.update("Sentiment = classifier(RssEntryTitle)")
+custom_sia_wsb = learn_sentiment_batched(custom_sia_wsb, classifier_batch)
+custom_sia_all = learn_sentiment_batched(custom_sia_all, classifier_batch)
+custom_sia_hackernews = learn_sentiment_batched(custom_sia_hackernews, classifier_batch)
+custom_sia_seeking_alpha = learn_sentiment_batched(custom_sia_seeking_alpha, classifier_batch)
 
 #Static readers
 rss_feed_url = "https://www.reddit.com/r/wallstreetbets/new/.rss"
@@ -80,7 +95,11 @@ custom_sia_hackernews_static = read_rss_static(rss_feed_url, rss_attributes_meth
 rss_feed_url = "https://seekingalpha.com/feed.xml"
 custom_sia_seeking_alpha_static = read_rss_static(rss_feed_url, rss_attributes_method=rss_attributes_seeking_alpha, rss_datetime_converter=datetime_converter_seeking_alpha)
 
-custom_sia_wsb_static = custom_sia_wsb_static.update("Sentiment = classifier(Sentence)")
-custom_sia_all_static = custom_sia_all_static.update("Sentiment = classifier(Sentence)")
-custom_sia_hackernews_static = custom_sia_hackernews_static.update("Sentiment = classifier(Sentence)")
-custom_sia_seeking_alpha_static = custom_sia_seeking_alpha_static.update("Sentiment = classifier(Sentence)")
+custom_sia_wsb_static = learn_sentiment_batched(custom_sia_wsb_static, classifier_batch, input_column="Sentence")
+custom_sia_all_static = learn_sentiment_batched(custom_sia_all_static, classifier_batch, input_column="Sentence")
+custom_sia_hackernews_static = learn_sentiment_batched(custom_sia_hackernews_static, classifier_batch, input_column="Sentence")
+custom_sia_seeking_alpha_static = learn_sentiment_batched(custom_sia_seeking_alpha_static, classifier_batch, input_column="Sentence")
+
+#Backfilled readers, seeded with the last few pages of each feed in the background and scored in batches as they're read
+rss_feed_urls = ["https://www.reddit.com/r/wallstreetbets/new/.rss", "https://www.reddit.com/r/all/new/.rss"]
+custom_sia_reddit_backfill = read_rss_backfill(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, column_names=["RssEntryTitle", "PublishDatetime", "RssFeedUrl", "Sentiment"], column_types=[dht.string, dht.datetime, dht.string, dht.string], score_method_batch=classifier_batch, max_pages=5, entry_keys=True)
@@ -1,87 +1,100 @@
 """
 read_rss_deephaven_learn.py
 
-An RSS reader that uses Deephaven learn to build a Naive Bayes Classifier.
+Defines a batched sentiment scoring stage built on Deephaven learn. Rows are gathered into NumPy arrays and scored
+a batch at a time, instead of calling the Python classifier once per row from an update() formula.
 
-Not ready yet
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
 """
-import feedparser
-
-import nltk.classify.util
-from nltk.classify import NaiveBayesClassifier
-from nltk.corpus import movie_reviews
-
 from deephaven.learn import gather
 from deephaven import learn
-from deephaven import DynamicTableWriter, Types as dht
-
-import numpy as np
-
-RSS_FEED_URL = "https://www.reddit.com/r/reddit.com/new/.rss"
-RSS_ATTRIBUTES_TO_ANALYZE = [
-    "title"
-]
-
-COLUMN_NAMES = [
-    "Sentence"
-]
-COLUMN_TYPES = [
-    dht.string
-]
-
-def word_feats(words):
-    d = dict([(word, True) for word in words])
-    return d
-
-def word_feats_string(strn):
-    d = dict([(word, True) for word in strn.split(" ")])
-    return d
-
-def build_model():
-    nltk.download('movie_reviews')
-
-    negids = movie_reviews.fileids('neg')
-    posids = movie_reviews.fileids('pos')
-
-    negfeats = [(word_feats(movie_reviews.words(fileids=[f])), 0) for f in negids]
-    posfeats = [(word_feats(movie_reviews.words(fileids=[f])), 1) for f in posids]
 
-    trainfeats = negfeats + posfeats
+#The maximum number of rows scored in a single batch
+_DEFAULT_LEARN_BATCH_SIZE = 1024
 
-    return (NaiveBayesClassifier.train(trainfeats), len(trainfeats))
-
-def build_model_func(classifier):
-    def a(strn):
-        return classifier.classify(word_feats_string(strn))
-    return a
-
-def table_to_numpy(rows, columns):
+def _table_to_numpy(rows, columns):
+    """
+    Gathers the column to score into a NumPy array
+    """
     return gather.table_to_numpy_2d(rows, columns, dtype=str)
 
-def numpy_to_table(data, idx):
-    return data[idx]
-
-feed = feedparser.parse(RSS_FEED_URL)
-rss_feed_table_writer = DynamicTableWriter(COLUMN_NAMES, COLUMN_TYPES)
-rss_feed_table = rss_feed_table_writer.getTable()
-
-for entry in feed.entries:
-    for attribute in RSS_ATTRIBUTES_TO_ANALYZE:
-        rss_feed_table_writer.logRow(
-            [entry[attribute]]
-        )
-
-(classifier, batch_size) = build_model()
-
-model_func = build_model_func(classifier)
-
-inputs = [learn.Input(["Sentence"], table_to_numpy)]
-outputs = [learn.Output("Sentiment", numpy_to_table, "String")]
+def _build_scatter_func(output_index, output_count):
+    """
+    Generates a method that writes one output column from the scored batch
+    """
+    if output_count == 1:
+        def scatter(data, idx):
+            return data[idx]
+    else:
+        def scatter(data, idx):
+            return data[idx][output_index]
+    return scatter
+
+def batch_classifier(classifier):
+    """
+    Generates a method that scores a batch of strings using a classifier that scores a single string
+    """
+    def a(strns):
+        return [classifier(strn) for strn in strns]
+    return a
 
-result = learn.learn(
-    table = rss_feed_table,
-    model_func = model_func,
-    inputs = inputs,
-    outputs = outputs,
-    batch_size = batch_size
-)
+def learn_sentiment_batched(table, classifier_batch, input_column="RssEntryTitle", output_columns=None,
+        output_types=None, batch_size=_DEFAULT_LEARN_BATCH_SIZE):
+    """
+    Scores a column of a table in batches using Deephaven learn.
+
+    Parameters:
+        table (Table): The table to score. This can be a ticking table.
+        classifier_batch (method): A method that takes a list of strings and returns a list with one result per string.
+            If there is more than one output column, each result should be a sequence with one value per output column.
+        input_column (str): The name of the column to score.
+        output_columns (list<str>): The names of the columns to write the results to. Defaults to ["Sentiment"].
+        output_types (list<str>): The types of the output columns. Defaults to "String" for every output column.
+        batch_size (int): The maximum number of rows to score in a single batch.
+
+    Returns:
+        Table: The table with the output columns added.
+    """
+    if output_columns is None:
+        output_columns = ["Sentiment"]
+    if output_types is None:
+        output_types = ["String" for output_column in output_columns]
+
+    def model_func(data):
+        return classifier_batch(data[:, 0])
+
+    inputs = [learn.Input([input_column], _table_to_numpy)]
+    outputs = [
+        learn.Output(output_column, _build_scatter_func(i, len(output_columns)), output_type)
+        for (i, (output_column, output_type)) in enumerate(zip(output_columns, output_types))
+    ]
+
+    return learn.learn(
+        table = table,
+        model_func = model_func,
+        inputs = inputs,
+        outputs = outputs,
+        batch_size = batch_size
+    )
+
+def learn_sentiment(table, classifier, input_column="RssEntryTitle", output_columns=None, output_types=None,
+        batch_size=_DEFAULT_LEARN_BATCH_SIZE):
+    """
+    Scores a column of a table in batches using a classifier that scores a single string. This can be used in place of
+    table.update("Sentiment = classifier(RssEntryTitle)").
+
+    Parameters:
+        table (Table): The table to score. This can be a ticking table.
+        classifier (method): A method that takes a string and returns its sentiment. If there is more than one output
+            column, this should return a sequence with one value per output column.
+        input_column (str): The name of the column to score.
+        output_columns (list<str>): The names of the columns to write the results to. Defaults to ["Sentiment"].
+        output_types (list<str>): The types of the output columns. Defaults to "String" for every output column.
+        batch_size (int): The maximum number of rows to score in a single batch.
+
+    Returns:
+        Table: The table with the output columns added.
+    """
+    return learn_sentiment_batched(table, batch_classifier(classifier), input_column=input_column,
+                                   output_columns=output_columns, output_types=output_types, batch_size=batch_size)
@@ -6,49 +6,77 @@ An RSS reader in Python that does sentiment analysis using the NLKT default sent
 This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
 variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
 """
-import nltk
-nltk.download('vader_lexicon')
 from nltk.sentiment import SentimentIntensityAnalyzer
 
-def build_default_sia_classifier_func(classifier):
+def build_default_sia_classifier_func(classifier, model_id="vader"):
+    """
+    Generates a method that scores a string using the given SentimentIntensityAnalyzer. Scores are cached
+    in the shared score cache under the given model ID.
+    """
     def a(strn):
         sentiment = classifier.polarity_scores(strn)
         return [sentiment["pos"], sentiment["neu"], sentiment["neg"], sentiment["compound"]]
+    return cache_scores(model_id, a)
+
+def build_default_sia_classifier_batch_func(classifier):
+    """
+    Generates a method that scores a batch of strings using the given SentimentIntensityAnalyzer
+    """
+    def a(strns):
+        scores = []
+        for strn in strns:
+            sentiment = classifier.polarity_scores(strn)
+            scores.append([sentiment["pos"], sentiment["neu"], sentiment["neg"], sentiment["compound"]])
+        return scores
     return a
 
-classifier = build_default_sia_classifier_func(SentimentIntensityAnalyzer())
+#The lexicon is downloaded to the model store once, and only loaded when the first title is scored
+sia_model = LazyModel("vader", SentimentIntensityAnalyzer, nltk_resources={"vader_lexicon": "sentiment/vader_lexicon.zip"})
+classifier = build_default_sia_classifier_func(sia_model)
+
+#VADER is pure Python, so the new titles of each pull are scored in one batch, in worker processes if
+#RSS_SCORING_POOL_PROCESSES is set. Every batch goes to the pool, since pulls only have a few dozen titles.
+sia_scoring_pool = ScoringPool("vader", sia_model, build_default_sia_classifier_batch_func(sia_model), min_batch_size=1)
+sia_classifier_batch = cache_scores_batch("vader", sia_scoring_pool.score)
+
+#The VADER scores are written as double columns in the same row as the entry when it's read
+sia_column_names = [
+    "RssEntryTitle",
+    "PublishDatetime",
+    "RssFeedUrl",
+    "Positive",
+    "Neutral",
+    "Negative",
+    "Compound"
+]
+sia_column_types = [
+    dht.string,
+    dht.datetime,
+    dht.string,
+    dht.double,
+    dht.double,
+    dht.double,
+    dht.double
+]
+
+#Rolling 5 minute, 1 hour, and 1 day statistics of the VADER scores, kept per feed as the entries are scored
+built_in_sia_rolling_stats = RollingSentiment()
+built_in_sia_rolling = built_in_sia_rolling_stats.table
 
 rss_feed_urls = ["https://www.reddit.com/r/wallstreetbets/new/.rss"]
-built_in_sia_wsb = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit)
+built_in_sia_wsb = read_rss_continual(rss_feed_urls, rss_attributes_method=built_in_sia_rolling_stats.attributes_method(rss_attributes_method_with_scores(rss_attributes_method_reddit, classifier, score_method_batch=sia_classifier_batch)), rss_datetime_converter=datetime_converter_reddit, min_sleep_time=2, max_sleep_time=60, column_names=sia_column_names, column_types=sia_column_types, entry_keys=True)
 
+#r/all is pulled every second, so only the last 6 hours are kept in the tables and older rows are rolled off to /data
 rss_feed_urls = ["https://www.reddit.com/r/all/new/.rss"]
-built_in_sia_all = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, sleep_time=1)
+built_in_sia_all = read_rss_continual(rss_feed_urls, rss_attributes_method=built_in_sia_rolling_stats.attributes_method(rss_attributes_method_with_scores(rss_attributes_method_reddit, classifier, score_method_batch=sia_classifier_batch)), rss_datetime_converter=datetime_converter_reddit, sleep_time=1, max_sleep_time=30, column_names=sia_column_names, column_types=sia_column_types, retention_seconds=6 * 60 * 60, retention_name="built_in_sia_all", entry_keys=True)
+
+#The rows of r/all rolled off by earlier runs, followed by the rows of this run
+built_in_sia_all_history = read_rss_history("built_in_sia_all")
 
-reddit_all_wsb = read_rss_continual(["https://www.reddit.com/r/all/new/.rss", "https://www.reddit.com/r/wallstreetbets/new/.rss"], rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, sleep_time=1)
+reddit_all_wsb = read_rss_continual(["https://www.reddit.com/r/all/new/.rss", "https://www.reddit.com/r/wallstreetbets/new/.rss"], rss_attributes_method=rss_attributes_method_reddit, rss_datetime_converter=datetime_converter_reddit, sleep_time=1, max_sleep_time=30, retention_seconds=6 * 60 * 60, retention_name="reddit_all_wsb", entry_keys=True)
 
 rss_feed_urls = ["https://hnrss.org/newest"]
-built_in_sia_hackernews = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_method_hackernews, rss_datetime_converter=datetime_converter_hackernews, sleep_time=60)
+built_in_sia_hackernews = read_rss_continual(rss_feed_urls, rss_attributes_method=built_in_sia_rolling_stats.attributes_method(rss_attributes_method_with_scores(rss_attributes_method_hackernews, classifier, score_method_batch=sia_classifier_batch)), rss_datetime_converter=datetime_converter_hackernews, sleep_time=60, min_sleep_time=15, max_sleep_time=600, column_names=sia_column_names, column_types=sia_column_types, entry_keys=True)
 
 rss_feed_urls = ["https://seekingalpha.com/feed.xml"]
-built_in_sia_seeking_alpha = read_rss_continual(rss_feed_urls, rss_attributes_method=rss_attributes_seeking_alpha, rss_datetime_converter=datetime_converter_seeking_alpha, sleep_time=120)
-
-built_in_sia_wsb = built_in_sia_wsb.update("Sentiment = (org.jpy.PyListWrapper)classifier(RssEntryTitle)")\
-    .update("Positive = (double)Sentiment[0]")\
-    .update("Neutral = (double)Sentiment[1]")\
-    .update("Negative = (double)Sentiment[2]")\
-    .update("Compound = (double)Sentiment[3]")
-built_in_sia_all = built_in_sia_all.update("Sentiment = (org.jpy.PyListWrapper)classifier(RssEntryTitle)")\
-    .update("Positive = (double)Sentiment[0]")\
-    .update("Neutral = (double)Sentiment[1]")\
-    .update("Negative = (double)Sentiment[2]")\
-    .update("Compound = (double)Sentiment[3]")
-built_in_sia_hackernews = built_in_sia_hackernews.update("Sentiment = (org.jpy.PyListWrapper)classifier(RssEntryTitle)")\
-    .update("Positive = (double)Sentiment[0]")\
-    .update("Neutral = (double)Sentiment[1]")\
-    .update("Negative = (double)Sentiment[2]")\
-    .update("Compound = (double)Sentiment[3]")
-built_in_sia_seeking_alpha = built_in_sia_seeking_alpha.update("Sentiment = (org.jpy.PyListWrapper)classifier(RssEntryTitle)")\
-    .update("Positive = (double)Sentiment[0]")\
-    .update("Neutral = (double)Sentiment[1]")\
-    .update("Negative = (double)Sentiment[2]")\
-    .update("Compound = (double)Sentiment[3]")
+built_in_sia_seeking_alpha = read_rss_continual(rss_feed_urls, rss_attributes_method=built_in_sia_rolling_stats.attributes_method(rss_attributes_method_with_scores(rss_attributes_seeking_alpha, classifier, score_method_batch=sia_classifier_batch)), rss_datetime_converter=datetime_converter_seeking_alpha, sleep_time=120, min_sleep_time=30, max_sleep_time=900, column_names=sia_column_names, column_types=sia_column_types, entry_keys=True)
@@ -6,17 +6,12 @@ An RSS reader that reads from multiple podcast URLs.
 This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
 variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
 """
-import json
-
 def rss_attributes_method_podcasts(entry):
-    return (entry["title"], rss_datetime_converter_podcasts(entry), entry["title_detail"]["base"],
-            json.dumps(entry))
+    return (entry["title"], rss_datetime_converter_podcasts(entry), entry["title_detail"]["base"])
 
 def rss_datetime_converter_podcasts(entry):
     try:
-        dt = parser.parse(entry["published"])
-        dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " UTC"
-        return convertDateTime(dts)
+        return entry_datetime(entry, "published")
     except:
         return currentTime()
 
@@ -29,15 +24,24 @@ column_names = [
     "RssEntryTitle",
     "PublishDatetime",
     "RssFeedUrl",
-    "JsonObject",
 ]
 column_types = [
     dht.string,
     dht.datetime,
     dht.string,
-    dht.string,
 ]
 
-podcast_feeds = read_rss_continual(podcast_feed_urls, sleep_time=300, rss_attributes_method=rss_attributes_method_podcasts,
+#The entry fields the podcast queries use, instead of a JSON string of the whole entry
+podcast_projection = [
+    ("EntryLink", dht.string, "link"),
+    ("Author", dht.string, "author"),
+    ("EnclosureUrl", dht.string, "enclosures.0.href"),
+    ("EnclosureType", dht.string, "enclosures.0.type"),
+    ("EnclosureBytes", dht.int64, "enclosures.0.length", int),
+    ("DurationSeconds", dht.double, "itunes_duration", duration_to_seconds),
+]
+
+podcast_feeds = read_rss_continual(podcast_feed_urls, sleep_time=300, max_sleep_time=3600, rss_attributes_method=rss_attributes_method_podcasts,
                                    rss_datetime_converter=rss_datetime_converter_podcasts, column_names=column_names,
-                                   column_types=column_types, thread_count=10)
+                                   column_types=column_types, thread_count=10, streaming=True, projection=podcast_projection,
+                                   entry_keys=True)
@@ -0,0 +1,118 @@
+"""
+reader_checkpoint.py
+
+Defines checkpoints of the state of read_rss_continual's feeds on the mounted /data volume. A checkpoint holds the seen
+entry keys, the ETag and Last-Modified values, and the schedule of every feed, so a restarted reader skips entries it
+has already written, gets a 304 from feeds that haven't changed, and spreads out the pulls of feeds that came due while
+it was down instead of pulling every feed at once.
+
+Checkpoints are gzipped JSON with the seen entry keys packed as 64-bit integers, and are written to a temporary file
+first so a crash never leaves a partial checkpoint behind.
+
+Checkpoints are only written every CHECKPOINT_INTERVAL seconds, not when Python exits, since the reader's threads keep
+Python from exiting cleanly. Entries written after the last checkpoint before a restart can be written again.
+
+The checkpoint path is set by the RSS_CHECKPOINT_PATH environment variable. If it's set to an empty string, no
+checkpoints are written or restored.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from array import array
+
+import base64
+import gzip
+import json
+import os
+import random
+import time
+
+CHECKPOINT_PATH = os.environ.get("RSS_CHECKPOINT_PATH", "/data/rss-reader-checkpoint.json.gz")
+
+#How often the reader state is checkpointed, in seconds
+CHECKPOINT_INTERVAL = 60
+
+#Feeds that came due while the reader was down are pulled at a random time within this many seconds of restarting
+CHECKPOINT_MAX_JITTER = 300
+
+#Bump this when the checkpoint format changes, so old checkpoints are ignored
+_CHECKPOINT_VERSION = 1
+
+def checkpoint_feed_state(feed_state):
+    """
+    Converts the state of a feed that needs to survive a restart to a dictionary that can be stored as JSON.
+    This should be called while holding the feed registry lock.
+    """
+    seen_entries = array("q", feed_state["seen_entries"].keys())
+    return {
+        "seen_entries": base64.b64encode(seen_entries.tobytes()).decode("ascii"),
+        "etag": feed_state["etag"],
+        "modified": feed_state["modified"],
+        "interval": feed_state["interval"],
+        "next_poll": feed_state["next_poll"],
+        "publish_times": list(feed_state["publish_times"])
+    }
+
+def restore_feed_state(feed_state, feed_checkpoint):
+    """
+    Restores the state of a feed from its checkpoint. The feed's poll bounds must already be set, since the saved
+    interval is kept within them.
+    """
+    seen_entries = array("q")
+    seen_entries.frombytes(base64.b64decode(feed_checkpoint["seen_entries"]))
+    feed_state["seen_entries"].update((entry_key, None) for entry_key in seen_entries)
+    feed_state["etag"] = feed_checkpoint["etag"]
+    feed_state["modified"] = feed_checkpoint["modified"]
+    feed_state["publish_times"].extend(feed_checkpoint["publish_times"])
+
+    interval = min(max(feed_checkpoint["interval"], feed_state["min_sleep_time"]), feed_state["max_sleep_time"])
+    feed_state["interval"] = interval
+    feed_state["next_poll"] = feed_checkpoint["next_poll"]
+
+    #Spread out the feeds that are already due so they aren't all pulled as soon as the reader starts
+    now = time.time()
+    if feed_state["next_poll"] <= now:
+        feed_state["next_poll"] = now + random.uniform(0, min(interval, CHECKPOINT_MAX_JITTER))
+
+def write_checkpoint(path, feed_checkpoints):
+    """
+    Writes the checkpoints of every feed to a file.
+
+    Parameters:
+        path (str): The path of the checkpoint file.
+        feed_checkpoints (dict): A dictionary of RSS feed URL to the feed's checkpoint from checkpoint_feed_state().
+    """
+    checkpoint = {
+        "version": _CHECKPOINT_VERSION,
+        "saved": time.time(),
+        "feeds": feed_checkpoints
+    }
+
+    #Write to a temporary file first so a crash never leaves a partial checkpoint behind
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+        json.dump(checkpoint, f, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+def read_checkpoint(path):
+    """
+    Reads the checkpoints of every feed from a file.
+
+    Returns:
+        dict: A dictionary of RSS feed URL to the feed's checkpoint, which is empty if there's no usable checkpoint.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except Exception as e:
+        print(f"Unable to read the reader checkpoint {path}, starting without it")
+        print(e)
+        return {}
+
+    if checkpoint.get("version") != _CHECKPOINT_VERSION:
+        return {}
+    return checkpoint["feeds"]
@@ -0,0 +1,243 @@
+"""
+rolling_sentiment.py
+
+Defines rolling-window sentiment statistics that are kept up to date as entries are scored. Every feed and window keeps
+a ring of time buckets, and each bucket keeps the count, sum, and sum of squares of every score, and a fixed-width
+histogram of the scores as a quantile sketch for the median. Old buckets are reused as the window slides, so the state
+per feed is fixed no matter how long the reader runs, and computing the statistics only ever touches the buckets of
+the window. Windows slide one bucket at a time, so the oldest bucket of a window may be partly outside of it.
+
+The statistics are written to a small ticking table every few seconds, with one row per feed and window. Each snapshot
+replaces the last one in the table, so the table only ever holds the latest statistics.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from deephaven import Types as dht
+from deephaven.DateTimeUtils import currentTime
+import numpy as np
+
+import threading
+import time
+
+#The default windows as (name, seconds, number of buckets) tuples
+DEFAULT_ROLLING_WINDOWS = [
+    ("5m", 5 * 60, 60),
+    ("1h", 60 * 60, 60),
+    ("1d", 24 * 60 * 60, 96)
+]
+
+#The VADER scores written by rss_attributes_method_with_scores, which are all between -1 and 1
+_DEFAULT_SCORE_NAMES = ["Positive", "Neutral", "Negative", "Compound"]
+_DEFAULT_SCORE_RANGE = (-1.0, 1.0)
+
+#The number of histogram bins per score. Medians are accurate to half a bin, which is 0.005 for scores from -1 to 1.
+_DEFAULT_HISTOGRAM_BINS = 200
+
+class _RollingWindow:
+    """
+    The buckets of one feed over one window
+    """
+    def __init__(self, seconds, bucket_count, score_count, bins):
+        self.bucket_seconds = seconds / bucket_count
+        self.bucket_ids = np.full(bucket_count, -1, dtype=np.int64)
+        self.counts = np.zeros((bucket_count, score_count), dtype=np.int64)
+        self.sums = np.zeros((bucket_count, score_count))
+        self.squares = np.zeros((bucket_count, score_count))
+        self.histograms = np.zeros((bucket_count, score_count, bins), dtype=np.int32)
+
+    def _bucket(self, timestamp):
+        """
+        Finds the slot of the bucket for a timestamp, clearing the slot if it still holds an older bucket
+        """
+        bucket_id = int(timestamp // self.bucket_seconds)
+        slot = bucket_id % len(self.bucket_ids)
+        if self.bucket_ids[slot] != bucket_id:
+            self.bucket_ids[slot] = bucket_id
+            self.counts[slot] = 0
+            self.sums[slot] = 0
+            self.squares[slot] = 0
+            self.histograms[slot] = 0
+        return slot
+
+    def add(self, timestamp, scores, valid, bin_indexes):
+        slot = self._bucket(timestamp)
+        self.counts[slot] += valid
+        self.sums[slot] += np.where(valid, scores, 0)
+        self.squares[slot] += np.where(valid, scores * scores, 0)
+        for (score_index, bin_index) in enumerate(bin_indexes):
+            if valid[score_index]:
+                self.histograms[slot, score_index, bin_index] += 1
+
+    def totals(self, timestamp):
+        """
+        Sums the buckets that are still in the window.
+
+        Returns:
+            (array, array, array, array): The counts, sums, and sums of squares of every score, and their histograms.
+        """
+        current_id = int(timestamp // self.bucket_seconds)
+        in_window = self.bucket_ids > current_id - len(self.bucket_ids)
+        return (self.counts[in_window].sum(axis=0), self.sums[in_window].sum(axis=0),
+                self.squares[in_window].sum(axis=0), self.histograms[in_window].sum(axis=0))
+
+class _SnapshotTableWriter(BufferedTableWriter):
+    """
+    A BufferedTableWriter whose table only shows the rows of its latest flush
+    """
+    def _add_flush_table(self, key, table, row_count):
+        #Dropping the table of the last flush from the map frees its rows
+        super()._add_flush_table(key, table, row_count)
+        if key > 0:
+            self._table_map.remove(key - 1)
+
+class RollingSentiment:
+    """
+    Rolling-window statistics of sentiment scores per feed, written to a ticking table
+    """
+    def __init__(self, score_names=None, windows=None, score_range=_DEFAULT_SCORE_RANGE,
+            bins=_DEFAULT_HISTOGRAM_BINS, emit_interval=10):
+        """
+        Parameters:
+            score_names (list<str>): The names of the scores. Defaults to the VADER scores.
+            windows (list<tuple>): The windows as (name, seconds, number of buckets) tuples. Defaults to
+                DEFAULT_ROLLING_WINDOWS.
+            score_range ((float, float)): The smallest and largest possible score, used for the histograms.
+            bins (int): The number of histogram bins per score.
+            emit_interval (float): How often the statistics are written to the table, in seconds.
+        """
+        self._score_names = list(_DEFAULT_SCORE_NAMES if score_names is None else score_names)
+        self._windows = list(DEFAULT_ROLLING_WINDOWS if windows is None else windows)
+        (self._low, self._high) = score_range
+        self._bins = bins
+        self._bin_centers = self._low + (np.arange(bins) + 0.5) * (self._high - self._low) / bins
+        self._emit_interval = emit_interval
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+        column_names = ["Timestamp", "RssFeedUrl", "Window", "Count"]
+        column_types = [dht.datetime, dht.string, dht.string, dht.int64]
+        for score_name in self._score_names:
+            column_names.extend([f"{score_name}Avg", f"{score_name}Med", f"{score_name}Std"])
+            column_types.extend([dht.double, dht.double, dht.double])
+        self._table_writer = _SnapshotTableWriter(column_names, column_types)
+        self.table = self._table_writer.getTable()
+
+        self._thread = threading.Thread(target=self._emit_periodically, name="rolling-sentiment", daemon=True)
+        self._thread.start()
+
+    def add(self, rss_feed_url, scores, timestamp=None):
+        """
+        Adds the scores of an entry to the windows of its feed. Scores that are None or NaN are skipped.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        scores = np.array([np.nan if score is None else score for score in scores], dtype=float)
+        valid = ~np.isnan(scores)
+        bin_indexes = np.clip(((np.nan_to_num(scores) - self._low) / (self._high - self._low) * self._bins).astype(int),
+                              0, self._bins - 1)
+
+        with self._lock:
+            windows = self._feeds.get(rss_feed_url)
+            if windows is None:
+                windows = [_RollingWindow(seconds, bucket_count, len(self._score_names), self._bins)
+                           for (_, seconds, bucket_count) in self._windows]
+                self._feeds[rss_feed_url] = windows
+            for window in windows:
+                window.add(timestamp, scores, valid, bin_indexes)
+
+    def _median(self, histogram, count):
+        """
+        Approximates the median from a histogram by interpolating within the bin that holds it
+        """
+        if count == 0:
+            return None
+        cumulative = np.cumsum(histogram)
+        bin_index = int(np.searchsorted(cumulative, count / 2))
+        below = cumulative[bin_index - 1] if bin_index > 0 else 0
+        fraction = (count / 2 - below) / histogram[bin_index] if histogram[bin_index] else 0.5
+        bin_width = (self._high - self._low) / self._bins
+        return self._bin_centers[bin_index] + (fraction - 0.5) * bin_width
+
+    def snapshot(self, timestamp=None):
+        """
+        Computes the statistics of every feed and window.
+
+        Returns:
+            list<tuple>: One (RSS feed URL, window name, count, then average, median, and standard deviation of every
+                score) tuple per feed and window.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        rows = []
+        with self._lock:
+            for (rss_feed_url, windows) in self._feeds.items():
+                for ((window_name, _, _), window) in zip(self._windows, windows):
+                    (counts, sums, squares, histograms) = window.totals(timestamp)
+                    row = [rss_feed_url, window_name, int(counts.max()) if len(counts) else 0]
+                    for score_index in range(len(self._score_names)):
+                        count = counts[score_index]
+                        if count == 0:
+                            row.extend([None, None, None])
+                            continue
+                        mean = sums[score_index] / count
+                        variance = max(squares[score_index] / count - mean * mean, 0)
+                        row.extend([float(mean), float(self._median(histograms[score_index], count)),
+                                    float(np.sqrt(variance))])
+                    rows.append(tuple(row))
+        return rows
+
+    def _emit_periodically(self):
+        while True:
+            time.sleep(self._emit_interval)
+            try:
+                now = currentTime()
+                self._table_writer.append_rows((now,) + row for row in self.snapshot())
+                self._table_writer.flush()
+            except Exception as e:
+                print("Error writing rolling sentiment statistics")
+                print(e)
+
+    def attributes_method(self, rss_attributes_method, feed_index=2, score_start=3):
+        """
+        Generates an rss_attributes_method that adds the scores of every row it returns to the rolling windows. If
+        the given method has a batch method, so does the generated one.
+
+        Parameters:
+            rss_attributes_method (method): A method that converts an RSS entry to a tuple of values followed by scores,
+                like the methods from rss_attributes_method_with_scores().
+            feed_index (int): The index of the RSS feed URL in the tuple.
+            score_start (int): The index of the first score in the tuple.
+
+        Returns:
+            method: A method that converts an RSS entry to the same tuple of values.
+        """
+        score_end = score_start + len(self._score_names)
+        def a(entry):
+            row = rss_attributes_method(entry)
+            self.add(row[feed_index], row[score_start:score_end])
+            return row
+
+        #Rows are only added once the whole batch is converted, so a failed batch isn't counted twice
+        def batch(entries):
+            rows = rss_attributes_method.batch(entries)
+            for row in rows:
+                self.add(row[feed_index], row[score_start:score_end])
+            return rows
+
+        if hasattr(rss_attributes_method, "batch"):
+            a.batch = batch
+        return a
+
+    def stats(self):
+        """
+        Reports the number of feeds and the bytes used by their windows.
+
+        Returns:
+            dict: A dictionary with the number of "feeds" and the "state_bytes" of their buckets.
+        """
+        with self._lock:
+            state_bytes = sum(window.counts.nbytes + window.sums.nbytes + window.squares.nbytes +
+                              window.histograms.nbytes + window.bucket_ids.nbytes
+                              for windows in self._feeds.values() for window in windows)
+            return {"feeds": len(self._feeds), "state_bytes": state_bytes}
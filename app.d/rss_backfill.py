@@ -0,0 +1,305 @@
+"""
+rss_backfill.py
+
+Defines a bulk backfill reader that loads the history of many RSS feeds at once, so new models and dashboards don't
+need to wait for live data to build up. Each feed is paged back through its history, following Reddit's after=
+parameter and RFC 5005 next and prev-archive links. Pages of different feeds are fetched concurrently, entries that
+the live readers have already written are skipped, and the rows are scored and written in large batches.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+import feedparser
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import threading
+import time
+
+#The number of rows scored and written at once
+_DEFAULT_BACKFILL_BATCH_SIZE = 5000
+
+#Reddit returns at most 100 entries per page
+_REDDIT_PAGE_SIZE = 100
+
+#The RFC 5005 link relations that lead to older entries, for paged feeds and archived feeds
+_OLDER_PAGE_RELS = ("next", "prev-archive")
+
+#The stats of every backfill, most recent last
+_backfill_stats = []
+_backfill_stats_lock = threading.Lock()
+
+def _next_page_url(page_url, feed):
+    """
+    Finds the URL of the page of a feed with the next older entries.
+
+    Parameters:
+        page_url (str): The URL of the current page.
+        feed (FeedParserDict): The parsed current page.
+
+    Returns:
+        str: The URL of the next page, or None if this is the last page.
+    """
+    for rel in _OLDER_PAGE_RELS:
+        for link in feed.feed.get("links", []):
+            if link.get("rel") == rel and link.get("href"):
+                return link["href"]
+
+    #Reddit listings page with after=, the fullname (the RSS id) of the oldest entry on the current page
+    parts = urlsplit(page_url)
+    if (parts.hostname or "").endswith("reddit.com") and feed.entries:
+        last_id = feed.entries[-1].get("id")
+        if last_id:
+            query = dict(parse_qsl(parts.query))
+            query.update(after=last_id, limit=str(_REDDIT_PAGE_SIZE))
+            return urlunsplit(parts._replace(query=urlencode(query)))
+    return None
+
+def _backfill_feed(rss_feed_url, fetcher, max_pages, page_queue):
+    """
+    Fetches and parses the pages of a feed, newest first, until the last page or max_pages. Each page is passed to
+    page_queue as (RSS feed URL, page number, entries, payload bytes) as soon as it's parsed.
+
+    Returns:
+        int: The number of pages read.
+    """
+    page_url = rss_feed_url
+    visited = set()
+    seen_keys = set()
+    pages = 0
+    while page_url is not None and page_url not in visited and pages < max_pages:
+        visited.add(page_url)
+        (body, response) = fetcher.fetch_bytes(page_url)
+
+        #Every page is parsed as the feed's own URL, so the rows and entry keys match those of the live reader
+        feed = feedparser.parse(body, response_headers={
+            "content-location": rss_feed_url,
+            "content-type": response.headers.get("Content-Type", "")
+        })
+
+        #Pages can overlap when entries are published during the backfill, so stop at a page with nothing new
+        entries = []
+        for entry in feed.entries:
+            entry_key = _entry_key(entry)
+            if entry_key not in seen_keys:
+                seen_keys.add(entry_key)
+                entries.append(entry)
+        page_queue(rss_feed_url, pages, entries, len(body))
+        pages += 1
+        if not entries:
+            break
+        page_url = _next_page_url(page_url, feed)
+    return pages
+
+def _dedup_against_live(rss_feed_url, page, entries, table_writer):
+    """
+    Drops the entries that the live reader of a feed has already written. The live reader's seen entries are only
+    checked, never changed, so the entries stay new to every other table that reads the feed.
+
+    The new entries of the first page are recorded for the live tables of the feed that write to table_writer too, so
+    their next pull doesn't write them again. Older pages are only checked, since they're older than anything the live
+    reader will see.
+    """
+    with _feed_registry_lock:
+        feed_state = _feed_registry.get(rss_feed_url)
+        if feed_state is None:
+            return entries
+        seen_entries = feed_state["seen_entries"]
+        new_entries = [entry for entry in entries if _entry_key(entry) not in seen_entries]
+        if page == 0:
+            for subscriber in feed_state["subscribers"]:
+                if subscriber["table_writer"] is table_writer:
+                    subscriber["written_by_backfill"] = (subscriber["written_by_backfill"] or set()) | \
+                        {_entry_key(entry) for entry in new_entries}
+    return new_entries
+
+def read_rss_backfill(rss_feed_urls, rss_attributes_method=None, rss_datetime_converter=None, column_names=None,
+        column_types=None, score_method_batch=None, score_index=0, max_pages=10, concurrency=8,
+        batch_size=_DEFAULT_BACKFILL_BATCH_SIZE, entry_keys=False, table_writer=None, fetcher=None, wait=False):
+    """
+    This method reads the history of many RSS feeds once and stores it in a Deephaven table. Use it to seed a table
+    before, or alongside, read_rss_continual.
+
+    Each feed is read back page by page, newest first, by following its RFC 5005 next or prev-archive links, or
+    Reddit's after= parameter for Reddit feeds. The pages of one feed are read in order, and up to concurrency feeds are
+    read at once. Entries already written by a read_rss_continual reader of the same feed URL are skipped. If that
+    reader writes to the same table_writer, the newest entries of the backfill are skipped by its next pull, so the two
+    don't write an entry twice. Other tables that read the feed still write every entry.
+
+    The backfill runs in a background thread and writes to the returned table as it reads, so it doesn't hold up the
+    scripts that start it, and only scores its rows once its first pages are read. Its pages share the fetcher's per
+    host rate limit with the live readers.
+
+    Rows are collected into batches of batch_size. If score_method_batch is set, the attribute at score_index of every
+    row in the batch is scored with one call, and the scores are appended to the rows, like
+    rss_attributes_method_with_scores() does one entry at a time.
+
+    The pages and rows read per second are printed when the backfill finishes. Use rss_backfill_stats() to see its
+    progress.
+
+    Parameters:
+        rss_feed_urls (list<str>): A list of RSS feed URLs to read.
+        rss_attributes_method (method): A method that converts an RSS entry to a tuple of values to write.
+        rss_datetime_converter (method): A method that takes an RSS feed entry and converts it to a Deephaven datetime
+            object. Entries without a datetime are skipped.
+        column_names (list<str>): A list of column names for the resulting table.
+        column_types (list<dht.type>): A list of column types for the resulting table.
+        score_method_batch (method): A method that takes a list of attributes and returns one score, or one sequence
+            of scores, per attribute.
+        score_index (int): The index of the attribute to score in the tuple returned by rss_attributes_method.
+        max_pages (int): The most pages to read from each feed.
+        concurrency (int): The most feeds to read at once.
+        batch_size (int): The number of rows to score and write at once.
+        entry_keys (bool): Whether to add the EntryKey and FeedId columns, like read_rss_continual. Defaults to False.
+        table_writer (BufferedTableWriter): A writer to write the rows to instead of a new table, for example the
+            writer of a read_rss_continual table. The writer must have the columns the rows are written with.
+        fetcher (PooledHttpFetcher): The fetcher used to download the pages. Defaults to default_fetcher.
+        wait (bool): Whether to wait for the backfill to finish before returning. Defaults to False.
+
+    Returns:
+        Table: The Deephaven table that will contain the results from the RSS feeds.
+    """
+    if column_names is None:
+        column_names = [
+            "RssEntryTitle",
+            "PublishDatetime",
+            "RssFeedUrl"
+        ]
+    if column_types is None:
+        column_types = [
+            dht.string,
+            dht.datetime,
+            dht.string
+        ]
+
+    if rss_attributes_method is None:
+        rss_attributes_method = _default_rss_attributes_method
+    if rss_datetime_converter is None:
+        rss_datetime_converter = _default_rss_datetime_converter
+
+    if entry_keys:
+        column_names = list(column_names) + ["EntryKey", "FeedId"]
+        column_types = list(column_types) + [dht.int64, dht.int32]
+
+    if table_writer is None:
+        table_writer = BufferedTableWriter(column_names, column_types)
+    if fetcher is None:
+        fetcher = default_fetcher
+
+    stats = {
+        "feeds": 0,
+        "failed_feeds": 0,
+        "pages": 0,
+        "payload_bytes": 0,
+        "entries": 0,
+        "duplicates": 0,
+        "rows": 0,
+        "scoring_seconds": 0.0,
+        "seconds": 0.0,
+        "pages_per_second": 0.0,
+        "rows_per_second": 0.0,
+        "finished": False
+    }
+    with _backfill_stats_lock:
+        _backfill_stats.append(stats)
+
+    #(row, key columns) tuples waiting to be scored and written. The key columns go after the scores.
+    batch = []
+
+    def write_batch():
+        if not batch:
+            return
+        rows = [tuple(row) for (row, _) in batch]
+        if score_method_batch is not None:
+            scoring_start = time.perf_counter()
+            scores = score_method_batch([row[score_index] for row in rows])
+            stats["scoring_seconds"] += time.perf_counter() - scoring_start
+            rows = [row + (tuple(row_scores) if isinstance(row_scores, (list, tuple)) else (row_scores,))
+                    for (row, row_scores) in zip(rows, scores)]
+        table_writer.append_rows(row + key_columns for (row, (_, key_columns)) in zip(rows, batch))
+        table_writer.flush()
+        stats["rows"] += len(batch)
+        batch.clear()
+
+    #Pages are parsed on the executor's threads, and converted, scored, and written on the backfill's thread as they arrive
+    pages = []
+    pages_lock = threading.Condition()
+    def page_queue(rss_feed_url, page, entries, payload_bytes):
+        with pages_lock:
+            pages.append((rss_feed_url, page, entries, payload_bytes))
+            pages_lock.notify()
+
+    def process_pages():
+        with pages_lock:
+            ready = pages[:]
+            pages.clear()
+        for (rss_feed_url, page, entries, payload_bytes) in ready:
+            stats["pages"] += 1
+            stats["payload_bytes"] += payload_bytes
+            stats["entries"] += len(entries)
+            new_entries = _dedup_against_live(rss_feed_url, page, entries, table_writer)
+            stats["duplicates"] += len(entries) - len(new_entries)
+            for entry in new_entries:
+                try:
+                    if rss_datetime_converter(entry) is None:
+                        continue
+                    key_columns = (_entry_key(entry) ^ _entry_key_salt(rss_feed_url), _feed_id(rss_feed_url)) \
+                        if entry_keys else ()
+                    batch.append((rss_attributes_method(entry), key_columns))
+                except Exception as e:
+                    #Swallow exceptions for now if things go wrong, the RSS feeds aren't 100% the same format
+                    print(f"Error on reading RSS feed {rss_feed_url}")
+                    print(e)
+                if len(batch) >= batch_size:
+                    write_batch()
+
+    rss_feed_urls = list(dict.fromkeys(rss_feed_urls))
+
+    def backfill():
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="rss-backfill") as executor:
+            futures = {executor.submit(_backfill_feed, url, fetcher, max_pages, page_queue): url
+                       for url in rss_feed_urls}
+            remaining = set(futures)
+            while remaining:
+                with pages_lock:
+                    if not pages:
+                        pages_lock.wait(timeout=0.1)
+                process_pages()
+                for future in [future for future in remaining if future.done()]:
+                    remaining.discard(future)
+                    stats["feeds"] += 1
+                    if future.exception() is not None:
+                        stats["failed_feeds"] += 1
+                        print(f"Error on backfilling RSS feed {futures[future]}")
+                        print(future.exception())
+        process_pages()
+        write_batch()
+
+        seconds = time.perf_counter() - start
+        stats["seconds"] = seconds
+        stats["pages_per_second"] = stats["pages"] / seconds if seconds > 0 else 0.0
+        stats["rows_per_second"] = stats["rows"] / seconds if seconds > 0 else 0.0
+        stats["finished"] = True
+        print(f"Backfilled {stats['rows']} rows from {stats['pages']} pages of {stats['feeds']} feeds in "
+              f"{seconds:.1f}s ({stats['pages_per_second']:.1f} pages/sec, {stats['rows_per_second']:.1f} rows/sec)")
+
+    thread = threading.Thread(target=backfill, name="rss-backfill-reader", daemon=True)
+    thread.start()
+    if wait:
+        thread.join()
+    return table_writer.getTable()
+
+def rss_backfill_stats():
+    """
+    Reports the stats of every backfill started by read_rss_backfill().
+
+    Returns:
+        list<dict>: One dictionary per backfill, oldest first, with the number of "feeds", "failed_feeds", "pages",
+            "payload_bytes", "entries" read, "duplicates" already written by the live readers, "rows" written, the
+            "scoring_seconds" and total "seconds" spent, the "pages_per_second" and "rows_per_second", and whether
+            it's "finished". The seconds and rates of a backfill that's still running are filled in when it finishes.
+    """
+    with _backfill_stats_lock:
+        return [dict(stats) for stats in _backfill_stats]
@@ -0,0 +1,140 @@
+"""
+score_cache.py
+
+Defines a process-wide cache of sentiment scores that's shared by every classifier and table, so the same title is
+only scored once per model no matter how many feeds or tables it shows up in.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from collections import OrderedDict
+
+import hashlib
+import threading
+import unicodedata
+
+#The maximum number of scores kept in the cache before the least recently used ones are evicted
+_DEFAULT_SCORE_CACHE_SIZE = 100000
+
+_score_cache = OrderedDict()
+_score_cache_lock = threading.Lock()
+_score_cache_state = {
+    "max_size": _DEFAULT_SCORE_CACHE_SIZE,
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0
+}
+
+def _score_cache_key(model_id, strn):
+    """
+    Computes the cache key for a string scored by a model. The string is normalized to NFC so equivalent
+    unicode titles share a key.
+    """
+    normalized = unicodedata.normalize("NFC", strn)
+    return hashlib.blake2b(f"{model_id}\0{normalized}".encode("utf-8"), digest_size=16).digest()
+
+def cache_scores(model_id, classifier):
+    """
+    Generates a method that looks up scores in the shared cache before falling back to the given classifier
+
+    Parameters:
+        model_id (str): A string that identifies the model. Classifiers that can return different scores for the
+            same string must use different model IDs.
+        classifier (method): A method that takes a string and returns its score.
+
+    Returns:
+        method: A method that takes a string and returns its score.
+    """
+    def a(strn):
+        key = _score_cache_key(model_id, strn)
+        with _score_cache_lock:
+            if key in _score_cache:
+                _score_cache.move_to_end(key)
+                _score_cache_state["hits"] += 1
+                return _score_cache[key]
+            _score_cache_state["misses"] += 1
+
+        #Score outside of the lock so other threads aren't blocked on the model
+        score = classifier(strn)
+
+        with _score_cache_lock:
+            _score_cache[key] = score
+            while len(_score_cache) > _score_cache_state["max_size"]:
+                _score_cache.popitem(last=False)
+                _score_cache_state["evictions"] += 1
+        return score
+    return a
+
+def cache_scores_batch(model_id, classifier_batch):
+    """
+    Generates a method that looks up a batch of scores in the shared cache, and only passes the strings that aren't
+    cached to the given batch classifier. Scores are shared with cache_scores() methods of the same model ID.
+
+    Parameters:
+        model_id (str): A string that identifies the model. Classifiers that can return different scores for the
+            same string must use different model IDs.
+        classifier_batch (method): A method that takes a list of strings and returns their scores in the same order.
+
+    Returns:
+        method: A method that takes a list of strings and returns their scores in the same order.
+    """
+    def a(strns):
+        strns = [str(strn) for strn in strns]
+        keys = [_score_cache_key(model_id, strn) for strn in strns]
+        scores = [None] * len(strns)
+        missing = []
+        with _score_cache_lock:
+            for (i, key) in enumerate(keys):
+                if key in _score_cache:
+                    _score_cache.move_to_end(key)
+                    scores[i] = _score_cache[key]
+                else:
+                    missing.append(i)
+            _score_cache_state["hits"] += len(strns) - len(missing)
+            _score_cache_state["misses"] += len(missing)
+
+        if not missing:
+            return scores
+
+        #Strings repeated in the batch are only scored once. Score outside of the lock like cache_scores().
+        missing_strns = {}
+        for i in missing:
+            missing_strns.setdefault(keys[i], strns[i])
+        missing_scores = dict(zip(missing_strns, classifier_batch(list(missing_strns.values()))))
+        for i in missing:
+            scores[i] = missing_scores[keys[i]]
+
+        with _score_cache_lock:
+            for (key, score) in missing_scores.items():
+                _score_cache[key] = score
+            while len(_score_cache) > _score_cache_state["max_size"]:
+                _score_cache.popitem(last=False)
+                _score_cache_state["evictions"] += 1
+        return scores
+    return a
+
+def set_score_cache_size(max_size):
+    """
+    Sets the maximum number of scores kept in the shared cache, evicting the least recently used scores if needed
+    """
+    with _score_cache_lock:
+        _score_cache_state["max_size"] = max_size
+        while len(_score_cache) > max_size:
+            _score_cache.popitem(last=False)
+            _score_cache_state["evictions"] += 1
+
+def score_cache_stats():
+    """
+    Reports the hit and miss counts of the shared score cache.
+
+    Returns:
+        dict: A dictionary with the "hits", "misses", "evictions", "size", and "max_size" of the cache.
+    """
+    with _score_cache_lock:
+        return {
+            "hits": _score_cache_state["hits"],
+            "misses": _score_cache_state["misses"],
+            "evictions": _score_cache_state["evictions"],
+            "size": len(_score_cache),
+            "max_size": _score_cache_state["max_size"]
+        }
@@ -0,0 +1,146 @@
+"""
+scoring_pool.py
+
+Defines an optional scoring backend that scores batches of strings in a pool of worker processes. VADER and NLTK are
+pure Python, so scoring in the Deephaven process only ever uses one core. The pool keeps a warm copy of the model in
+every worker, splits each batch across the workers, and returns the scores in order.
+
+Small batches aren't worth shipping to another process, so they're scored in process instead. The VADER tables in
+read_rss_default_analysis.py send the new titles of every pull to their pool, so the engine threads don't score them.
+
+The pool size is set by the RSS_SCORING_POOL_PROCESSES environment variable. If it's 0 or not set, no pool is started
+and everything is scored in process.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import time
+
+#The directory scoring_worker.py is imported from by the worker processes
+SCORING_WORKER_DIR = "/app.d"
+
+SCORING_POOL_PROCESSES = int(os.environ.get("RSS_SCORING_POOL_PROCESSES", "0"))
+
+#Batches smaller than this are scored in process
+_DEFAULT_MIN_POOL_BATCH_SIZE = 64
+
+class ScoringPool:
+    """
+    A pool of worker processes that score batches of strings with a warm copy of a model
+    """
+    def __init__(self, scorer_kind, model, in_process_score_batch, processes=SCORING_POOL_PROCESSES,
+            min_batch_size=_DEFAULT_MIN_POOL_BATCH_SIZE):
+        """
+        Parameters:
+            scorer_kind (str): The kind of model, either "vader" or "naive_bayes_numpy".
+            model (object): The model, or a LazyModel. The model must be picklable.
+            in_process_score_batch (method): A method that scores a batch of strings in process, used for small
+                batches and if the pool can't be started.
+            processes (int): The number of worker processes. If 0, everything is scored in process.
+            min_batch_size (int): Batches smaller than this are scored in process.
+        """
+        self._scorer_kind = scorer_kind
+        self._model = model
+        self._in_process_score_batch = in_process_score_batch
+        self._processes = processes
+        self._min_batch_size = min_batch_size
+        self._pool = None
+        self._pool_failed = processes <= 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "started": None,
+            "queued_chunks": 0,
+            "pool_batches": 0,
+            "in_process_batches": 0,
+            "worker_seconds": 0.0
+        }
+
+    def _get_pool(self):
+        """
+        Starts the worker processes the first time the pool is used. Workers are spawned rather than forked,
+        because forking the Deephaven process isn't safe.
+        """
+        with self._lock:
+            if self._pool is None and not self._pool_failed:
+                try:
+                    if SCORING_WORKER_DIR not in sys.path:
+                        sys.path.append(SCORING_WORKER_DIR)
+                    context = multiprocessing.get_context("spawn")
+
+                    #The Python interpreter is embedded in Deephaven, so sys.executable may not be a Python binary
+                    if not os.path.basename(sys.executable or "").startswith("python"):
+                        context.set_executable(shutil.which("python3"))
+
+                    model = self._model.get() if isinstance(self._model, LazyModel) else self._model
+                    from scoring_worker import init_worker
+                    self._pool = context.Pool(self._processes, initializer=init_worker,
+                                              initargs=(self._scorer_kind, model))
+                    self._stats["started"] = time.time()
+                except Exception as e:
+                    self._pool_failed = True
+                    print("Unable to start the scoring pool, scoring in process instead")
+                    print(e)
+            return self._pool
+
+    def score(self, strns):
+        """
+        Scores a batch of strings.
+
+        Returns:
+            list: The scores in the same order as the strings.
+        """
+        strns = [str(strn) for strn in strns]
+        pool = None if len(strns) < self._min_batch_size else self._get_pool()
+        if pool is None:
+            with self._lock:
+                self._stats["in_process_batches"] += 1
+            return self._in_process_score_batch(strns)
+
+        from scoring_worker import score_batch
+        chunk_size = -(-len(strns) // self._processes)
+        chunks = [strns[i:i + chunk_size] for i in range(0, len(strns), chunk_size)]
+        with self._lock:
+            self._stats["queued_chunks"] += len(chunks)
+            self._stats["pool_batches"] += 1
+
+        scores = []
+        completed_chunks = 0
+        try:
+            for (chunk_scores, worker_seconds) in pool.imap(score_batch, chunks):
+                scores.extend(chunk_scores)
+                completed_chunks += 1
+                with self._lock:
+                    self._stats["queued_chunks"] -= 1
+                    self._stats["worker_seconds"] += worker_seconds
+        except Exception as e:
+            print("Error scoring in the scoring pool, scoring in process instead")
+            print(e)
+            with self._lock:
+                self._stats["queued_chunks"] -= len(chunks) - completed_chunks
+            return self._in_process_score_batch(strns)
+        return scores
+
+    def stats(self):
+        """
+        Reports the queue depth and worker utilization of the pool.
+
+        Returns:
+            dict: A dictionary with the "processes", the "queue_depth" in chunks waiting for or being scored by a worker,
+                the "worker_utilization" as the fraction of worker time spent scoring since the pool started, and the
+                number of "pool_batches" and "in_process_batches".
+        """
+        with self._lock:
+            elapsed = 0 if self._stats["started"] is None else time.time() - self._stats["started"]
+            processes = 0 if self._pool is None else self._processes
+            return {
+                "processes": processes,
+                "queue_depth": self._stats["queued_chunks"],
+                "worker_utilization": self._stats["worker_seconds"] / (elapsed * processes) if elapsed and processes else 0.0,
+                "pool_batches": self._stats["pool_batches"],
+                "in_process_batches": self._stats["in_process_batches"]
+            }
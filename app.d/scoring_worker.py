@@ -0,0 +1,49 @@
+"""
+scoring_worker.py
+
+Defines the worker side of the scoring pool in scoring_pool.py.
+
+Unlike the other files in app.d, this file isn't run through Application Mode. It's imported as a module by the scoring
+pool's worker processes, so it can't use variables defined in the other scripts.
+"""
+from naive_bayes_numpy import build_numpy_model_batch_func
+
+import time
+
+_worker_state = {
+    "score_batch": None
+}
+
+def _build_vader_batch_func(model):
+    """
+    Generates a method that scores a batch of strings using a SentimentIntensityAnalyzer
+    """
+    def a(strns):
+        scores = []
+        for strn in strns:
+            sentiment = model.polarity_scores(strn)
+            scores.append([sentiment["pos"], sentiment["neu"], sentiment["neg"], sentiment["compound"]])
+        return scores
+    return a
+
+_SCORER_BUILDERS = {
+    "vader": _build_vader_batch_func,
+    "naive_bayes_numpy": build_numpy_model_batch_func
+}
+
+def init_worker(scorer_kind, model):
+    """
+    Loads the model into the worker process once, so it's warm for every batch
+    """
+    _worker_state["score_batch"] = _SCORER_BUILDERS[scorer_kind](model)
+
+def score_batch(strns):
+    """
+    Scores a batch of strings.
+
+    Returns:
+        (list, float): The scores in the same order as the strings, and the number of seconds spent scoring.
+    """
+    start = time.perf_counter()
+    scores = _worker_state["score_batch"](strns)
+    return (scores, time.perf_counter() - start)
@@ -0,0 +1,262 @@
+"""
+table_retention.py
+
+Defines time-based retention for the RSS reader tables. A retained table groups the tables of its flushes into a new
+generation every roll off interval, and shows the generations that are still in its hot window merged together.
+Each generation is written to a Parquet file on the mounted /data volume, partitioned by the date it was archived, as
+soon as it's closed. Once every row of a generation is older than the hot window, it's dropped from the table, so the
+memory of its rows is freed. read_rss_history() loads the archived rows and the rows that haven't been archived yet as
+one table, so analyses can run over the whole history of a table.
+
+Generations are archived by when they were written, not by the timestamps of their rows, so entries that are written
+late with old timestamps are still archived exactly once. Generations are archived on a timer rather than when Python
+exits, since the reader's threads keep Python from exiting cleanly. The tables start empty after a restart, and the
+rows written in the last roll off interval before a restart are lost.
+
+The archive directory is set by the RSS_RETENTION_DIR environment variable.
+
+This file is meant to run through Deephaven's Application Mode as part of several Python scripts. Because of this, some
+variables may not be defined in here, but instead in helper_functions.py or read_rss.py.
+"""
+from deephaven import ParquetTools, WindowCheck
+from deephaven.TableTools import merge
+
+from collections import deque
+from datetime import datetime, timezone
+
+import glob
+import os
+import threading
+import time
+
+RETENTION_DIR = os.environ.get("RSS_RETENTION_DIR", "/data/rss-archive")
+
+#How often a retained table starts a new generation, archives the last one, and drops the generations older than its hot
+#window, in seconds
+RETENTION_ROLL_OFF_INTERVAL = 300
+
+#Retained tables by name, used by read_rss_history() to find the rows that haven't been rolled off yet
+_retained_writers = {}
+_retained_writers_lock = threading.Lock()
+
+class RetainedTableWriter(BufferedTableWriter):
+    """
+    A BufferedTableWriter that writes to a new generation every roll off interval, archives closed generations to
+    Parquet files, and drops them once they're older than its hot window
+    """
+    def __init__(self, column_names, column_types, name, hot_window, timestamp_column="PublishDatetime",
+            archive_dir=None, roll_off_interval=RETENTION_ROLL_OFF_INTERVAL):
+        """
+        Parameters:
+            column_names (list<str>): A list of column names for the table.
+            column_types (list<dht.type>): A list of column types for the table.
+            name (str): The name of the table, used as its directory in the archive. Must be unique.
+            hot_window (float): How many seconds of rows the table shows before they're only in the archive.
+            timestamp_column (str): The datetime column that decides which rows the table shows.
+            archive_dir (str): The directory of the archive. Defaults to RETENTION_DIR.
+            roll_off_interval (float): How often a new generation is started and archived, and old generations are
+                dropped, in seconds. Up to this many seconds of rows are lost when the reader restarts.
+        """
+        with _retained_writers_lock:
+            if name in _retained_writers:
+                raise ValueError(f"A retained table named {name} already exists")
+        super().__init__(column_names, column_types)
+
+        self.name = name
+        self._hot_window = hot_window
+        self._archive_dir = os.path.join(RETENTION_DIR if archive_dir is None else archive_dir, name)
+        self._roll_off_interval = roll_off_interval
+
+        #Files from every run of the reader share the archive, so each run names its files after when it started
+        self._run_id = int(time.time())
+
+        #The generations that haven't been dropped yet, oldest first. Each is a dictionary with its "id", the keys and
+        #tables of its flushes, "tables", the total number of rows written before it started, "first_row", its number of
+        #"rows" and when it was "closed", both None for the generation that's being written to, and whether it's
+        #"archived".
+        #The table map of BufferedTableWriter has the flushes of every generation in the table, and the unarchived table
+        #map only the flushes of the ones not archived yet.
+        self._unarchived_table_map = LocalTableMap(None)
+        self._unarchived_table_map.put("empty", self._new_flush_table([]))
+        self._generations = deque()
+        self._next_generation_id = 0
+        self._start_generation(time.time())
+
+        self._rows_archived = 0
+        self._rows_rolled_off = 0
+        self._roll_off_lock = threading.Lock()
+        self._retention_stats = {
+            "files": 0,
+            "generations_rolled_off": 0,
+            "roll_off_seconds": 0.0
+        }
+
+        self.full_table = self._table
+        self.unarchived_table = self._unarchived_table_map.merge()
+        self.hot_table = WindowCheck.addTimeWindow(self.full_table, timestamp_column, int(hot_window * 1e9),
+                                                   "InHotWindow")\
+            .where("InHotWindow = true")\
+            .dropColumns("InHotWindow")
+
+        with _retained_writers_lock:
+            _retained_writers[name] = self
+
+        self._thread = threading.Thread(target=self._roll_off_periodically, name=f"retention-{name}", daemon=True)
+        self._thread.start()
+
+    def _start_generation(self, now):
+        """
+        Closes the generation that's being written to, and adds the tables of later flushes to a new generation.
+        Must be called while holding the writer's lock, except from __init__.
+        """
+        if self._generations:
+            self._generations[-1]["closed"] = now
+            self._generations[-1]["rows"] = self._stats["rows"] - self._generations[-1]["first_row"]
+
+        generation = {
+            "id": self._next_generation_id,
+            "tables": [],
+            "first_row": self._stats["rows"],
+            "rows": None,
+            "closed": None,
+            "archived": False
+        }
+        self._next_generation_id += 1
+        self._generations.append(generation)
+
+    def _add_flush_table(self, key, table, row_count):
+        super()._add_flush_table(key, table, row_count)
+        self._unarchived_table_map.put(key, table)
+        self._generations[-1]["tables"].append((key, table))
+
+    def getTable(self):
+        return self.hot_table
+
+    def roll_off(self, cutoff=None):
+        """
+        Starts a new generation if rows were written to the current one, writes every closed generation that hasn't
+        been archived yet to a new Parquet file, and drops the generations closed before the cutoff from the table.
+
+        Parameters:
+            cutoff (float): The time, in seconds since the epoch, to drop generations closed before. Defaults to the
+                start of the hot window.
+
+        Returns:
+            int: The number of rows archived.
+        """
+        now = time.time()
+        if cutoff is None:
+            cutoff = now - self._hot_window
+
+        with self._roll_off_lock:
+            with self._lock:
+                if self._stats["rows"] > self._generations[-1]["first_row"]:
+                    self._start_generation(now)
+                unarchived = [generation for generation in self._generations
+                              if generation["closed"] is not None and not generation["archived"]]
+
+            rows_archived = 0
+            for generation in unarchived:
+                if generation["rows"]:
+                    start_time = time.time()
+                    partition = datetime.now(timezone.utc).strftime("Date=%Y-%m-%d")
+                    path = os.path.join(self._archive_dir, partition, f"{self._run_id}-{generation['id']:06d}.parquet")
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                    #Nothing is added to a closed generation, so its tables never change
+                    tables = [table for (key, table) in generation["tables"]]
+                    ParquetTools.writeTable(merge(*tables) if len(tables) > 1 else tables[0], path)
+                    self._retention_stats["files"] += 1
+                    self._retention_stats["roll_off_seconds"] += time.time() - start_time
+
+                for (key, table) in generation["tables"]:
+                    self._unarchived_table_map.remove(key)
+                generation["archived"] = True
+                self._rows_archived += generation["rows"]
+                rows_archived += generation["rows"]
+
+            with self._lock:
+                dropped = []
+                while self._generations[0]["archived"] and self._generations[0]["closed"] <= cutoff:
+                    dropped.append(self._generations.popleft())
+
+            for generation in dropped:
+                #Dropping the tables of the generation from the map frees its rows
+                for (key, table) in generation["tables"]:
+                    self._table_map.remove(key)
+                generation["tables"] = []
+                self._rows_rolled_off += generation["rows"]
+                self._retention_stats["generations_rolled_off"] += 1
+            return rows_archived
+
+    def _roll_off_periodically(self):
+        while True:
+            time.sleep(self._roll_off_interval)
+            try:
+                self.roll_off()
+            except Exception as e:
+                print(f"Error rolling off rows of the retained table {self.name}")
+                print(e)
+
+    def archive_files(self, start_date=None):
+        """
+        Lists the Parquet files of the archive, oldest first.
+
+        Parameters:
+            start_date (str): The first date, as YYYY-MM-DD, to list the files of. Defaults to every date.
+
+        Returns:
+            list<str>: The paths of the files.
+        """
+        paths = []
+        for partition in sorted(glob.glob(os.path.join(self._archive_dir, "Date=*"))):
+            if start_date is not None and os.path.basename(partition)[len("Date="):] < start_date:
+                continue
+            paths.extend(sorted(glob.glob(os.path.join(partition, "*.parquet"))))
+        return paths
+
+    def stats(self):
+        """
+        Reports how many rows have been written, archived, and rolled off, in how many files.
+
+        Returns:
+            dict: The stats of BufferedTableWriter.stats(), with the number of "rows_archived", the number of
+                "rows_rolled_off" of the table, the "hot_rows" that are still in the table, the number of
+                "generations" in the table and "generations_rolled_off", the number of archive "files" written, and
+                the "roll_off_seconds" spent writing them.
+        """
+        stats = super().stats()
+        with self._roll_off_lock:
+            stats.update(self._retention_stats)
+            stats["rows_archived"] = self._rows_archived
+            stats["rows_rolled_off"] = self._rows_rolled_off
+        with self._lock:
+            stats["hot_rows"] = self._stats["rows"] - stats["rows_rolled_off"]
+            stats["generations"] = len(self._generations)
+        return stats
+
+def read_rss_history(name, start_date=None):
+    """
+    Loads the whole history of a retained table, from its Parquet archive and the rows that haven't been archived yet.
+
+    The archive is read once, when this is called. Rows written after that are added to the result as they're written,
+    but rows that are archived after that leave the result along with their generation, so the result doesn't keep
+    every generation in memory. Call this again to load them from the archive.
+
+    Parameters:
+        name (str): The name of the retained table, as passed to read_rss_continual.
+        start_date (str): The first date, as YYYY-MM-DD, to load archive files from. Rows are partitioned by the date
+            they were rolled off. Defaults to every date.
+
+    Returns:
+        Table: The Deephaven table of the archived rows followed by the rows that haven't been archived yet.
+    """
+    with _retained_writers_lock:
+        table_writer = _retained_writers.get(name)
+    if table_writer is None:
+        raise ValueError(f"No retained table named {name}")
+
+    #Hold the roll off lock so no generation is in both the archive files and the unarchived rows, or in neither
+    with table_writer._roll_off_lock:
+        cold_tables = [ParquetTools.readTable(path) for path in table_writer.archive_files(start_date)]
+    return merge(*cold_tables, table_writer.unarchived_table) if cold_tables else table_writer.unarchived_table
@@ -0,0 +1,66 @@
+# Micro-benchmark of the datetime converters in datetime_converters.py against the original converters,
+# which formatted the parsed datetime back to a string and reparsed it with convertDateTime
+from deephaven import DynamicTableWriter, Types as dht
+from deephaven.DateTimeUtils import convertDateTime
+
+from dateutil import parser
+from datetime import datetime
+
+import timeit
+
+BENCHMARK_ITERATIONS = 10000
+
+def legacy_datetime_converter_reddit(entry):
+    dt = datetime.fromisoformat(entry["updated"])
+    dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " UTC"
+    return convertDateTime(dts)
+
+def legacy_datetime_converter_hackernews(entry):
+    dt = parser.parse(entry["published"])
+    dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " UTC"
+    return convertDateTime(dts)
+
+def legacy_datetime_converter_seeking_alpha(entry):
+    dt = parser.parse(entry["published"])
+    dts = dt.strftime("%Y-%m-%dT%H:%M:%S") + " NY"
+    return convertDateTime(dts)
+
+benchmark_entries = {
+    "reddit": {
+        "updated": "2021-12-01T15:04:05+00:00",
+        "title_detail": {"base": "https://www.reddit.com/r/all/new/.rss"}
+    },
+    "hackernews": {
+        "published": "Wed, 01 Dec 2021 15:04:05 +0000",
+        "title_detail": {"base": "https://hnrss.org/newest"}
+    },
+    "seeking_alpha": {
+        "published": "Wed, 01 Dec 2021 10:04:05 -0500",
+        "title_detail": {"base": "https://seekingalpha.com/feed.xml"}
+    }
+}
+benchmark_converters = [
+    ("reddit", legacy_datetime_converter_reddit, datetime_converter_reddit),
+    ("hackernews", legacy_datetime_converter_hackernews, datetime_converter_hackernews),
+    ("seeking_alpha", legacy_datetime_converter_seeking_alpha, datetime_converter_seeking_alpha)
+]
+
+benchmark_writer = DynamicTableWriter(
+    ["Feed", "LegacyMicros", "FastMicros", "Speedup", "LegacyDatetime", "FastDatetime"],
+    [dht.string, dht.double, dht.double, dht.double, dht.datetime, dht.datetime]
+)
+for (feed_name, legacy_converter, fast_converter) in benchmark_converters:
+    entry = benchmark_entries[feed_name]
+    legacy_seconds = timeit.timeit(lambda: legacy_converter(entry), number=BENCHMARK_ITERATIONS)
+    fast_seconds = timeit.timeit(lambda: fast_converter(entry), number=BENCHMARK_ITERATIONS)
+    benchmark_writer.logRow(
+        feed_name,
+        legacy_seconds / BENCHMARK_ITERATIONS * 1e6,
+        fast_seconds / BENCHMARK_ITERATIONS * 1e6,
+        legacy_seconds / fast_seconds,
+        legacy_converter(entry),
+        fast_converter(entry)
+    )
+    print(f"{feed_name}: legacy {legacy_seconds / BENCHMARK_ITERATIONS * 1e6:.2f}us, fast {fast_seconds / BENCHMARK_ITERATIONS * 1e6:.2f}us")
+
+datetime_converter_benchmark = benchmark_writer.getTable()
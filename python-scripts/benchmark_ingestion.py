@@ -0,0 +1,266 @@
+# Offline benchmark of the RSS ingestion path. A local HTTP server serves synthetic Reddit, Hacker News, and podcast
+# shaped feeds that publish at a fixed rate, read_rss_continual reads them into tables scored with the VADER classifier,
+# and the titles are scored again with the Naive Bayes classifier at the end. Nothing is pulled from the internet.
+#
+# CPU time and memory are measured for the whole process, so they include the synthetic feed server.
+# Results are written to the ingestion_benchmark table, and as JSON to BENCHMARK_RESULTS_DIR so runs can be compared.
+# The benchmark feeds are stopped with stop_rss_feeds() when the run ends, so they aren't polled or checkpointed after it.
+from deephaven import DynamicTableWriter, Types as dht
+import numpy as np
+
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+BENCHMARK_SECONDS = 120
+BENCHMARK_RESULTS_DIR = "/data/benchmarks"
+
+#Whether to trace Python allocations to report the peak Python memory of the whole run. Tracing slows everything down,
+#so it's off by default and only the max RSS of the process is reported.
+BENCHMARK_TRACE_MEMORY = False
+
+#The feeds to serve for each feed shape. The publish rate is in entries per second per feed, and every feed starts
+#with a full page of entries that were published before the benchmark started.
+BENCHMARK_FEEDS = {
+    "reddit": {"feeds": 20, "entries_per_feed": 25, "publish_rate": 1.0, "summary_bytes": 500},
+    "hackernews": {"feeds": 5, "entries_per_feed": 20, "publish_rate": 0.2, "summary_bytes": 200},
+    "podcast": {"feeds": 50, "entries_per_feed": 300, "publish_rate": 0.01, "summary_bytes": 2000}
+}
+
+_BENCHMARK_WORDS = ("good bad great terrible stock market moon crash rally earnings growth loss profit buy sell hold "
+                    "quarter guidance beat miss rate inflation fed launch release update podcast episode interview").split()
+
+_benchmark_random = random.Random(0)
+_benchmark_start = time.time()
+
+def _benchmark_text(word_count):
+    return " ".join(_benchmark_random.choice(_BENCHMARK_WORDS) for _ in range(word_count))
+
+def _publish_time(feed_config, index):
+    """
+    The publish time of the index-th entry of a feed. The first page of entries is published before the benchmark starts.
+    """
+    return _benchmark_start + (index - feed_config["entries_per_feed"] + 1) / feed_config["publish_rate"]
+
+def _published_count(feed_config, now):
+    return feed_config["entries_per_feed"] + int((now - _benchmark_start) * feed_config["publish_rate"])
+
+#Every rendered entry and its title, so every pull of a feed serves the same entries without rendering them again
+_benchmark_entry_lock = threading.Lock()
+_benchmark_entries = {}
+
+def _render_entry(feed_kind, feed_index, index):
+    key = (feed_kind, feed_index, index)
+    with _benchmark_entry_lock:
+        if key in _benchmark_entries:
+            return _benchmark_entries[key][1]
+
+    title = _benchmark_text(8)
+    summary = _benchmark_text(BENCHMARK_FEEDS[feed_kind]["summary_bytes"] // 6)
+    published = datetime.fromtimestamp(_publish_time(BENCHMARK_FEEDS[feed_kind], index), timezone.utc)
+    guid = f"{feed_kind}-{feed_index}-{index}"
+    link = f"http://benchmark.invalid/{guid}"
+    if feed_kind == "reddit":
+        rendered = (f"<entry><id>{guid}</id><title>{title}</title><link href=\"{link}\"/>"
+                    f"<updated>{published.isoformat()}</updated><content>{escape(summary)}</content></entry>")
+    else:
+        rendered = (f"<item><guid>{guid}</guid><title>{title}</title><link>{link}</link>"
+                    f"<pubDate>{format_datetime(published, usegmt=True)}</pubDate><description>{escape(summary)}</description>")
+        if feed_kind == "podcast":
+            rendered += (f"<enclosure url=\"{link}.mp3\" type=\"audio/mpeg\" length=\"{10000000 + index}\"/>"
+                         f"<itunes:duration>{index % 3}:{index % 60:02d}:00</itunes:duration>")
+        rendered += "</item>"
+
+    with _benchmark_entry_lock:
+        return _benchmark_entries.setdefault(key, (title, rendered))[1]
+
+def _render_feed(feed_kind, feed_index, published_count):
+    feed_config = BENCHMARK_FEEDS[feed_kind]
+    first = max(0, published_count - feed_config["entries_per_feed"])
+    entries = "".join(_render_entry(feed_kind, feed_index, index) for index in range(published_count - 1, first - 1, -1))
+    if feed_kind == "reddit":
+        return f"<?xml version=\"1.0\"?><feed xmlns=\"http://www.w3.org/2005/Atom\"><title>{feed_kind}</title>{entries}</feed>"
+    return ("<?xml version=\"1.0\"?><rss version=\"2.0\" xmlns:itunes=\"http://www.itunes.com/dtds/podcast-1.0.dtd\">"
+            f"<channel><title>{feed_kind}</title>{entries}</channel></rss>")
+
+class _BenchmarkFeedHandler(BaseHTTPRequestHandler):
+    """
+    Serves /<feed kind>/<feed index> with the entries published so far, and answers conditional GETs with a 304
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        try:
+            (feed_kind, feed_index) = self.path.strip("/").split("/")
+            feed_config = BENCHMARK_FEEDS[feed_kind]
+            feed_index = int(feed_index)
+        except (KeyError, ValueError):
+            self.send_error(404)
+            return
+
+        published_count = _published_count(feed_config, time.time())
+        etag = f"\"{published_count}\""
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = _render_feed(feed_kind, feed_index, published_count).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+class _BenchmarkFeedServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        #Streaming readers close the connection as soon as they reach an entry they've already seen
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+def _measured_attributes_method(rss_attributes_method, feed_kind, measurements):
+    """
+    Wraps an rss_attributes_method to record when each row is written, and how long after its entry was published
+    """
+    feed_config = BENCHMARK_FEEDS[feed_kind]
+    def measure(entries):
+        written = time.time()
+        with measurements["lock"]:
+            for entry in entries:
+                index = int(entry["id"].rsplit("-", 1)[1])
+                measurements["rows"] += 1
+                if index >= feed_config["entries_per_feed"]:
+                    measurements["latencies"].append(written - _publish_time(feed_config, index))
+
+    def a(entry):
+        row = rss_attributes_method(entry)
+        measure([entry])
+        return row
+
+    #Keep the batch method, so scored feeds are measured the way the live tables score them
+    def batch(entries):
+        rows = rss_attributes_method.batch(entries)
+        measure(entries)
+        return rows
+
+    if hasattr(rss_attributes_method, "batch"):
+        a.batch = batch
+    return a
+
+def _percentiles(values):
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    (p50, p90, p99) = np.percentile(values, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99), "max": float(max(values))}
+
+benchmark_server = _BenchmarkFeedServer(("127.0.0.1", 0), _BenchmarkFeedHandler)
+threading.Thread(target=benchmark_server.serve_forever, name="rss-benchmark-server", daemon=True).start()
+benchmark_url = f"http://127.0.0.1:{benchmark_server.server_port}"
+
+#Every synthetic feed is on the same host, so don't rate limit it like a real host
+benchmark_fetcher = PooledHttpFetcher(host_rate=1e6, host_burst=1e6)
+
+if BENCHMARK_TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+if tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak"):
+    tracemalloc.reset_peak()
+cpu_start = time.process_time()
+wall_start = time.time()
+
+benchmark_measurements = {}
+benchmark_tables = {}
+benchmark_feed_urls = []
+for (feed_kind, feed_config) in BENCHMARK_FEEDS.items():
+    measurements = {"lock": threading.Lock(), "rows": 0, "latencies": []}
+    benchmark_measurements[feed_kind] = measurements
+    feed_urls = [f"{benchmark_url}/{feed_kind}/{feed_index}" for feed_index in range(feed_config["feeds"])]
+    benchmark_feed_urls.extend(feed_urls)
+    if feed_kind == "podcast":
+        benchmark_tables[feed_kind] = read_rss_continual(feed_urls,
+            rss_attributes_method=_measured_attributes_method(rss_attributes_method_podcasts, feed_kind, measurements),
+            rss_datetime_converter=rss_datetime_converter_podcasts, sleep_time=5, min_sleep_time=1, max_sleep_time=60,
+            concurrency=32, streaming=True, projection=podcast_projection, fetcher=benchmark_fetcher)
+    else:
+        (rss_attributes_method, rss_datetime_converter) = {
+            "reddit": (rss_attributes_method_reddit, datetime_converter_reddit),
+            "hackernews": (rss_attributes_method_hackernews, datetime_converter_hackernews)
+        }[feed_kind]
+        scored_attributes_method = rss_attributes_method_with_scores(rss_attributes_method,
+            build_default_sia_classifier_func(sia_model), score_method_batch=sia_classifier_batch)
+        benchmark_tables[feed_kind] = read_rss_continual(feed_urls,
+            rss_attributes_method=_measured_attributes_method(scored_attributes_method, feed_kind, measurements),
+            rss_datetime_converter=rss_datetime_converter, sleep_time=1, min_sleep_time=0.5, max_sleep_time=10,
+            column_names=sia_column_names, column_types=sia_column_types, concurrency=32, fetcher=benchmark_fetcher)
+
+time.sleep(BENCHMARK_SECONDS)
+
+wall_seconds = time.time() - wall_start
+cpu_seconds = time.process_time() - cpu_start
+python_peak_bytes = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+
+#The poll stats of the benchmark feeds are only reported until they're stopped
+poll_stats = rss_poll_stats()
+stop_rss_feeds(benchmark_feed_urls)
+benchmark_server.shutdown()
+
+#Score every synthetic title with the Naive Bayes scoring pool, skipping the score cache, to measure batch scoring throughput
+benchmark_titles = [title for (title, rendered) in list(_benchmark_entries.values())]
+scoring_start = time.perf_counter()
+naive_bayes_scoring_pool.score(benchmark_titles)
+scoring_seconds = time.perf_counter() - scoring_start
+
+benchmark_results = {
+    "started": datetime.fromtimestamp(wall_start, timezone.utc).isoformat(),
+    "seconds": wall_seconds,
+    "config": BENCHMARK_FEEDS,
+    "cpu_seconds": cpu_seconds,
+    "cpu_utilization": cpu_seconds / wall_seconds,
+    "python_peak_bytes": python_peak_bytes,
+    "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    "naive_bayes_titles_per_second": len(benchmark_titles) / scoring_seconds if scoring_seconds else None,
+    "feeds": {}
+}
+for (feed_kind, measurements) in benchmark_measurements.items():
+    feed_poll_stats = [stats for (url, stats) in poll_stats.items() if url.startswith(f"{benchmark_url}/{feed_kind}/")]
+    benchmark_results["feeds"][feed_kind] = {
+        "rows": measurements["rows"],
+        "rows_per_second": measurements["rows"] / wall_seconds,
+        "live_rows": len(measurements["latencies"]),
+        "latency_seconds": _percentiles(measurements["latencies"]),
+        "polls": sum(stats["polls"] for stats in feed_poll_stats),
+        "not_modified": sum(stats["not_modified"] for stats in feed_poll_stats)
+    }
+
+os.makedirs(BENCHMARK_RESULTS_DIR, exist_ok=True)
+results_path = os.path.join(BENCHMARK_RESULTS_DIR, f"ingestion-{int(wall_start)}.json")
+with open(results_path, "w") as f:
+    json.dump(benchmark_results, f, indent=2)
+print(f"Wrote benchmark results to {results_path}")
+
+benchmark_writer = DynamicTableWriter(
+    ["FeedKind", "Rows", "RowsPerSecond", "LatencyP50", "LatencyP90", "LatencyP99", "Polls", "NotModified"],
+    [dht.string, dht.int64, dht.double, dht.double, dht.double, dht.double, dht.int64, dht.int64]
+)
+for (feed_kind, feed_results) in benchmark_results["feeds"].items():
+    latency = feed_results["latency_seconds"]
+    benchmark_writer.logRow(feed_kind, feed_results["rows"], feed_results["rows_per_second"], latency["p50"],
+                            latency["p90"], latency["p99"], feed_results["polls"], feed_results["not_modified"])
+    print(f"{feed_kind}: {feed_results['rows_per_second']:.1f} rows/s, p50 latency {latency['p50']}s, p99 latency {latency['p99']}s")
+print(f"CPU {cpu_seconds:.1f}s ({benchmark_results['cpu_utilization']:.0%}), max RSS {benchmark_results['max_rss_bytes'] / 1e6:.1f}MB")
+
+ingestion_benchmark = benchmark_writer.getTable()
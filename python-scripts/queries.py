@@ -2,7 +2,9 @@
 from deephaven import Aggregation as agg, as_list
 
 built_in_sia_hackernews_averages = built_in_sia_hackernews.aggBy(as_list([agg.AggAvg("Positive", "Negative", "Neutral", "Compound")]))
-built_in_sia_hackernews_medians = built_in_sia_hackernews.aggBy(as_list([agg.AggMed("Positive", "Negative", "Neutral", "Compound")]))
+# Medians over the whole history get slower every day, so use the approximate medians of the rolling windows instead
+built_in_sia_hackernews_medians = built_in_sia_rolling.where("RssFeedUrl = `https://hnrss.org/newest`")\
+    .view("Window", "Count", "Positive = PositiveMed", "Negative = NegativeMed", "Neutral = NeutralMed", "Compound = CompoundMed")
 built_in_sia_hackernews_deviations = built_in_sia_hackernews.aggBy(as_list([agg.AggStd("Positive", "Negative", "Neutral", "Compound")]))
 
 # Positive percent of built in analysis
@@ -15,5 +17,17 @@ custom_sia_hackernews_positive_percent = custom_sia_hackernews.update("PositiveC
     .aggBy(as_list([agg.AggSum("PositiveCount"), agg.AggCount("TotalCount")]))\
     .update("PositivePercent = PositiveCount / TotalCount")
 
-# Join 2 tables on the unique datetime and sentence combination
-hackernews_joined = built_in_sia_hackernews.join(custom_sia_hackernews, "PublishDatetime, RssEntryTitle", "TextSentiment = Sentiment")
+# Join 2 tables on the hashed entry key, which is unique even when two entries share a title and datetime
+hackernews_joined = built_in_sia_hackernews.join(custom_sia_hackernews, "EntryKey", "TextSentiment = Sentiment")
+
+# Per feed pull statistics, to find slow or failing feeds
+rss_poll_metrics_by_feed = rss_poll_metrics.update("Failed = isNull(ErrorClass) ? 0 : 1")\
+    .aggBy(as_list([agg.AggAvg("AvgFetchSeconds = FetchSeconds", "AvgParseSeconds = ParseSeconds", "AvgScoringSeconds = ScoringSeconds"),
+                    agg.AggSum("Failures = Failed", "NewEntries"),
+                    agg.AggCount("Polls"),
+                    agg.AggLast("LastHttpStatus = HttpStatus", "LastErrorClass = ErrorClass")]), "RssFeedUrl")\
+    .sortDescending("AvgFetchSeconds")
+
+# The whole history of r/all, from the rows rolled off to /data and the rows still in the table
+built_in_sia_all_daily_averages = built_in_sia_all_history.update("Day = formatDate(PublishDatetime, TZ_NY)")\
+    .aggBy(as_list([agg.AggAvg("Positive", "Negative", "Neutral", "Compound"), agg.AggCount("Entries")]), "Day")